@@ -14,6 +14,8 @@ from gitingest.ingestion import ingest_query
 from gitingest.query_parsing import parse_query
 from gitingest.utils.exceptions import handle_exceptions
 
+WRITE_BUFFER_SIZE = 1024 * 1024  # 1 MB
+
 
 @click.command()
 @click.argument("source", type=str, default=".")
@@ -119,9 +121,13 @@ def _sync_main(
         
         output_path.parent.mkdir(parents=True, exist_ok=True)
         try:
-            # Combine all parts for the file output
-            full_content = f"{summary}\n\n{tree}\n\n{content_or_url}"
-            output_path.write_text(full_content, encoding="utf-8")
+            # Write the parts one after another instead of joining them into a single string first
+            with open(output_path, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+                f.write(summary.encode("utf-8"))
+                f.write(b"\n\n")
+                f.write(tree.encode("utf-8"))
+                f.write(b"\n\n")
+                f.write(content_or_url.encode("utf-8"))
             click.echo(f"\nContent digest written to: {output_path.resolve()}")
         except Exception as e:
              click.echo(f"\nError writing content digest to {output_path.resolve()}: {e}", err=True)
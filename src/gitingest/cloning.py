@@ -2,23 +2,65 @@
 
 import os
 import logging
+import re
 from pathlib import Path
-from typing import Optional
-import asyncio
+from typing import Dict, List, Optional
 import urllib.parse
 
 from gitingest.schemas import CloneConfig
-from gitingest.utils.git_utils import check_repo_exists, ensure_git_installed, run_command
+from gitingest.utils.git_utils import check_repo_exists, ensure_git_installed, get_git_semaphore, run_command
 from gitingest.utils.timeout_wrapper import async_timeout
-from gitingest.config import GITHUB_PAT
+from gitingest.config import GITHUB_PAT, ensure_tmp_base
 
 TIMEOUT: int = 60
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@async_timeout(TIMEOUT)
+# The token is URL-encoded once; both its raw and encoded forms are redacted from logs and error messages
+_ENCODED_PAT: Optional[str] = urllib.parse.quote(GITHUB_PAT, safe="") if GITHUB_PAT else None
+_PAT_RE: Optional[re.Pattern[str]] = (
+    re.compile("|".join(re.escape(token) for token in sorted({GITHUB_PAT, _ENCODED_PAT}, key=len, reverse=True)))
+    if GITHUB_PAT
+    else None
+)
+
+
+def _redact(text: str) -> str:
+    """
+    Replace every occurrence of the GitHub token in a string.
+
+    Parameters
+    ----------
+    text : str
+        The string to redact, such as a command line or an error message.
+
+    Returns
+    -------
+    str
+        The string with the raw and URL-encoded token replaced by asterisks.
+    """
+    return _PAT_RE.sub("*****", text) if _PAT_RE else text
+
+
+class _Redacted:
+    """
+    A command line that is joined and redacted only when a log record actually formats it.
+
+    Parameters
+    ----------
+    cmd : List[str]
+        The command and its arguments.
+    """
+
+    __slots__ = ("cmd",)
+
+    def __init__(self, cmd: List[str]) -> None:
+        self.cmd = cmd
+
+    def __str__(self) -> str:
+        return _redact(" ".join(self.cmd))
+
+
 async def clone_repo(config: CloneConfig) -> None:
     """
     Clone a repository to a local path based on the provided configuration.
@@ -27,6 +69,9 @@ async def clone_repo(config: CloneConfig) -> None:
     It can clone a specific branch or commit if provided, and it raises exceptions if
     any errors occur during the cloning process.
 
+    The clone holds one slot of the git concurrency limit (see `get_git_semaphore`). The `TIMEOUT` only starts once
+    the slot is acquired, so requests queued behind a burst wait their turn instead of timing out.
+
     Parameters
     ----------
     config : CloneConfig
@@ -38,6 +83,22 @@ async def clone_repo(config: CloneConfig) -> None:
         If the repository is not found or if the provided URL is invalid.
     OSError
         If an error occurs while creating the parent directory for the repository.
+    AsyncTimeoutError
+        If the clone takes longer than `TIMEOUT` seconds once started.
+    """
+    async with get_git_semaphore():
+        await _clone_repo(config)
+
+
+@async_timeout(TIMEOUT)
+async def _clone_repo(config: CloneConfig) -> None:
+    """
+    Clone a repository as described by `clone_repo`, within `TIMEOUT` seconds.
+
+    Parameters
+    ----------
+    config : CloneConfig
+        The configuration for cloning the repository.
     """
     # Extract and validate query parameters
     url: str = config.url
@@ -46,11 +107,12 @@ async def clone_repo(config: CloneConfig) -> None:
     branch: Optional[str] = config.branch
     partial_clone: bool = config.subpath != "/"
 
-    logger.info(f"Starting clone of repository: {url} to path: {local_path}")
+    logger.info("Starting clone of repository: %s to path: %s", url, local_path)
     
     # Create parent directory if it doesn't exist
     parent_dir = Path(local_path).parent
     try:
+        ensure_tmp_base()
         os.makedirs(parent_dir, exist_ok=True)
     except OSError as exc:
         raise OSError(f"Failed to create parent directory {parent_dir}: {exc}") from exc
@@ -60,38 +122,51 @@ async def clone_repo(config: CloneConfig) -> None:
         raise ValueError("Repository not found, make sure it is public or you have access")
 
     clone_url = url
-    clone_cmd = ["git", "clone", "--single-branch"]
+    clone_cmd = ["git"]
+    if partial_clone:
+        # Cone mode matches whole directories instead of evaluating gitignore-style patterns against every path
+        clone_cmd += ["-c", "core.sparseCheckoutCone=true"]
+    clone_cmd += ["clone", "--quiet", "--single-branch"]
     
     # Add GitHub PAT if available and URL is from GitHub
-    env = os.environ.copy()
+    env: Optional[Dict[str, str]] = None
     if GITHUB_PAT and "github.com" in url:
-        logger.info(f"Using GitHub PAT for git clone: {'*' * 5}{GITHUB_PAT[-4:] if GITHUB_PAT else 'None'}")
+        logger.info("Using GitHub PAT for git clone: *****%s", GITHUB_PAT[-4:])
         
         # Instead of using environment variables, modify the URL to include the token
         # This is the recommended way to authenticate with GitHub via HTTPS after August 2021
-        if url.startswith("https://github.com"):
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme == "https" and parts.hostname == "github.com":
             # Format: https://{token}@github.com/{owner}/{repo}.git
-            encoded_token = urllib.parse.quote(GITHUB_PAT, safe='')
-            clone_url = url.replace("https://", f"https://{encoded_token}@")
+            parts = parts._replace(netloc=f"{_ENCODED_PAT}@github.com")
             # Add .git if not present
-            if not clone_url.endswith(".git"):
-                clone_url = f"{clone_url}.git"
-            
-            logger.info(f"Modified clone URL to use token authentication: {clone_url.replace(encoded_token, '****')}")
+            if not parts.path.endswith(".git"):
+                parts = parts._replace(path=f"{parts.path}.git")
+            clone_url = urllib.parse.urlunsplit(parts)
+
+            logger.info("Modified clone URL to use token authentication: %s", _Redacted([clone_url]))
         else:
             # Fallback to old method
+            env = os.environ.copy()
             env["GIT_ASKPASS"] = "echo"
             env["GIT_USERNAME"] = "git"
             env["GIT_PASSWORD"] = GITHUB_PAT
             logger.info("Added GitHub credentials to environment variables for authentication")
     else:
-        logger.warning(f"No GitHub PAT found or not a GitHub URL when cloning: {url}")
+        logger.warning("No GitHub PAT found or not a GitHub URL when cloning: %s", url)
         if not GITHUB_PAT:
             logger.warning("GITHUB_PAT environment variable is not set or empty in cloning.py")
 
     # TODO re-enable --recurse-submodules
     if partial_clone:
         clone_cmd += ["--filter=blob:none", "--sparse"]
+        if commit:
+            # The commit is checked out once the sparse-checkout paths are set, skip the default branch checkout
+            clone_cmd += ["--no-checkout"]
+    elif commit:
+        # A commit checkout needs the full history, but only the blobs of that commit:
+        # skip the default branch checkout and let `git checkout` fetch the missing blobs.
+        clone_cmd += ["--filter=blob:none", "--no-checkout"]
 
     if not commit:
         clone_cmd += ["--depth=1"]
@@ -100,40 +175,33 @@ async def clone_repo(config: CloneConfig) -> None:
 
     clone_cmd += [clone_url, local_path]
     # Log command without exposing token
-    logger.info(f"Running clone command: {' '.join([cmd.replace(GITHUB_PAT, '*****') if GITHUB_PAT and GITHUB_PAT in cmd else cmd for cmd in clone_cmd])}")
+    logger.info("Running clone command: %s", _Redacted(clone_cmd))
 
-    # Clone the repository with the environment variables set
+    # Clone the repository with the environment variables set.
+    # Git's output is not needed: --quiet drops progress reporting and stdout goes to the null device.
     await ensure_git_installed()
-    proc = await asyncio.create_subprocess_exec(
-        *clone_cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-        env=env
-    )
-    stdout, stderr = await proc.communicate()
-    if proc.returncode != 0:
-        error_message = stderr.decode().strip()
-        logger.error(f"Clone command failed: {error_message}")
-        safe_clone_cmd = [cmd.replace(GITHUB_PAT, '*****') if GITHUB_PAT and GITHUB_PAT in cmd else cmd for cmd in clone_cmd]
-        raise RuntimeError(f"Command failed: {' '.join(safe_clone_cmd)}\nError: {error_message}")
-    
-    logger.info("Repository cloned successfully")
-
-    if commit or partial_clone:
-        checkout_cmd = ["git", "-C", local_path]
-
-        if partial_clone:
-            subpath = config.subpath.lstrip("/")
-            if config.blob:
-                # When ingesting from a file url (blob/branch/path/file.txt), we need to remove the file name.
-                subpath = str(Path(subpath).parent.as_posix())
-
-            checkout_cmd += ["sparse-checkout", "set", subpath]
+    try:
+        await run_command(*clone_cmd, env=env, discard_stdout=True)
+    except RuntimeError as exc:
+        error_message = _redact(str(exc))
+        logger.error("Clone command failed: %s", error_message)
+        raise RuntimeError(error_message) from None
 
-        if commit:
-            checkout_cmd += ["checkout", commit]
+    logger.info("Repository cloned successfully")
 
-        logger.info(f"Running checkout command: {' '.join(checkout_cmd)}")
-        # Check out the specific commit and/or subpath
+    if partial_clone:
+        subpath = config.subpath.lstrip("/")
+        if config.blob:
+            # When ingesting from a file url (blob/branch/path/file.txt), we need to remove the file name.
+            subpath = str(Path(subpath).parent.as_posix())
+
+        sparse_checkout_cmd = ["git", "-C", local_path, "sparse-checkout", "set", "--cone", subpath]
+        logger.info("Running sparse-checkout command: %s", _Redacted(sparse_checkout_cmd))
+        await run_command(*sparse_checkout_cmd)
+
+    if commit:
+        checkout_cmd = ["git", "-C", local_path, "checkout", commit]
+        logger.info("Running checkout command: %s", _Redacted(checkout_cmd))
+        # Check out the specific commit, only the sparse-checkout paths are populated for a partial clone
         await run_command(*checkout_cmd)
         logger.info("Checkout completed successfully")
@@ -1,20 +1,78 @@
 """Handles uploading generated content to cloud storage (S3)."""
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
+import gzip
 import logging
 import os
+import tempfile
+import threading
+from typing import Any, Iterable
+
+from gitingest.config import S3_PRESIGNED_URL_EXPIRATION, S3_USE_ACCELERATE
 
 logger = logging.getLogger(__name__)
 
-def upload_content_to_s3(content: str, bucket_name: str, object_name: str) -> str | None:
+# Digests up to this size are buffered in memory; larger ones spill to a temporary file
+SPOOL_MAX_SIZE_BYTES = 8 * 1024 * 1024
+# Number of characters encoded at a time, so a large chunk is never copied to bytes in one go
+ENCODE_BLOCK_CHARS = 1024 * 1024
+# Digests are highly compressible source text; the zlib default level is a good speed/size trade-off
+GZIP_COMPRESS_LEVEL = 6
+
+# Keep connections alive and pooled so consecutive uploads reuse their TCP/TLS sessions
+S3_CLIENT_CONFIG = Config(
+    signature_version='s3v4',
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'max_attempts': 5},
+    s3={'addressing_style': 'virtual', 'use_accelerate_endpoint': S3_USE_ACCELERATE},
+)
+
+# The S3 client is created once and shared by every upload
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+
+def _get_s3_client() -> Any:
     """
-    Uploads a string content to an S3 bucket as a text file.
+    Return the shared S3 client, creating it on first use.
+
+    Creating a client loads the botocore service models and resolves credentials, which is too slow to repeat for
+    every upload. Clients are thread-safe, so a single instance serves all uploads; only its creation is locked.
+
+    Returns
+    -------
+    Any
+        The S3 client.
+    """
+    global _s3_client  # pylint: disable=global-statement
+
+    with _s3_client_lock:
+        if _s3_client is None:
+            client = boto3.client('s3', config=S3_CLIENT_CONFIG)
+            if not client.meta.region_name:
+                # Pre-signed URLs are signed for a region, so fall back to the environment or us-east-1
+                region = os.environ.get('AWS_REGION', 'us-east-1')
+                client = boto3.client('s3', region_name=region, config=S3_CLIENT_CONFIG)
+            _s3_client = client
+
+    return _s3_client
+
+def upload_content_to_s3(content: Iterable[str], bucket_name: str, object_name: str) -> str | None:
+    """
+    Uploads string content to an S3 bucket as a gzip-compressed text file.
+
+    The content is given as an iterable of string chunks, which are encoded and compressed one at a time into a
+    spooled temporary file and streamed to S3, so the full digest never has to be held as a single string or bytes
+    object. The object is stored with `Content-Encoding: gzip`, which browsers and HTTP clients decompress
+    transparently when downloading it.
 
     Parameters
     ----------
-    content : str
-        The string content to upload.
+    content : Iterable[str]
+        The string chunks to upload, in order.
     bucket_name : str
         The target S3 bucket name.
     object_name : str
@@ -24,40 +82,68 @@ def upload_content_to_s3(content: str, bucket_name: str, object_name: str) -> st
     -------
     str | None
         The URL of the uploaded object if successful, otherwise None.
-        The URL format assumes the object is publicly readable or uses standard S3 path format.
+        If `S3_PRESIGNED_URL_EXPIRATION` is set, this is a pre-signed URL that stops working after that many seconds
+        but does not need a public bucket; otherwise it is the permanent URL of the object, which needs public read
+        access.
     """
-    s3_client = boto3.client('s3')
-    region = s3_client.meta.region_name
-    if not region:
-        # Attempt to get region from environment or default if not configured in client
-        region = os.environ.get('AWS_REGION', 'us-east-1') # Default to us-east-1 if not set
+    s3_client = _get_s3_client()
 
     try:
-        # Encode the string content to bytes using UTF-8
-        content_bytes = content.encode('utf-8')
-
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=object_name,
-            Body=content_bytes,
-            ContentType='text/plain; charset=utf-8' # Specify content type
-        )
-        logger.info(f"Successfully uploaded {object_name} to bucket {bucket_name}.")
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE_BYTES) as body:
+            # Encode the chunks to bytes using UTF-8 and compress them, one block at a time
+            with gzip.GzipFile(fileobj=body, mode='wb', compresslevel=GZIP_COMPRESS_LEVEL, mtime=0) as compressed:
+                for chunk in content:
+                    for start in range(0, len(chunk), ENCODE_BLOCK_CHARS):
+                        compressed.write(chunk[start:start + ENCODE_BLOCK_CHARS].encode('utf-8'))
+            body.seek(0)
 
-        # Construct the object URL
-        # Note: This assumes public read access or standard S3 virtual-hosted style URL.
-        # For buckets in us-east-1, the region part might be omitted in the URL.
-        # Adjust based on actual bucket settings and desired access pattern (e.g., presigned URLs).
-        if region == 'us-east-1':
-             url = f"https://{bucket_name}.s3.amazonaws.com/{object_name}"
-        else:
-             url = f"https://{bucket_name}.s3.{region}.amazonaws.com/{object_name}"
+            # upload_fileobj switches to a parallel multipart upload for large bodies
+            s3_client.upload_fileobj(
+                body,
+                bucket_name,
+                object_name,
+                ExtraArgs={'ContentType': 'text/plain; charset=utf-8', 'ContentEncoding': 'gzip'},
+            )
+        logger.info("Successfully uploaded %s to bucket %s.", object_name, bucket_name)
 
-        return url
+        if S3_PRESIGNED_URL_EXPIRATION is None:
+            return _public_object_url(s3_client, bucket_name, object_name)
+
+        # Signing is done locally, no request is made to S3
+        return s3_client.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': bucket_name, 'Key': object_name},
+            ExpiresIn=S3_PRESIGNED_URL_EXPIRATION,
+        )
 
     except ClientError as e:
-        logger.error(f"Failed to upload {object_name} to bucket {bucket_name}: {e}")
+        logger.error("Failed to upload %s to bucket %s: %s", object_name, bucket_name, e)
         return None
     except Exception as e:
-        logger.error(f"An unexpected error occurred during S3 upload: {e}")
-        return None 
\ No newline at end of file
+        logger.error("An unexpected error occurred during S3 upload: %s", e)
+        return None
+
+
+def _public_object_url(s3_client: Any, bucket_name: str, object_name: str) -> str:
+    """
+    Build the permanent virtual-hosted style URL of an object, which works if the object is publicly readable.
+
+    Parameters
+    ----------
+    s3_client : Any
+        The S3 client, whose region the bucket is in.
+    bucket_name : str
+        The name of the S3 bucket.
+    object_name : str
+        The key of the object in the bucket.
+
+    Returns
+    -------
+    str
+        The URL of the object.
+    """
+    region = s3_client.meta.region_name
+    # For buckets in us-east-1, the region part is omitted from the URL
+    if region == 'us-east-1':
+        return f"https://{bucket_name}.s3.amazonaws.com/{object_name}"
+    return f"https://{bucket_name}.s3.{region}.amazonaws.com/{object_name}"
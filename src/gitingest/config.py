@@ -5,8 +5,6 @@ from pathlib import Path
 import os
 import logging
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Ingestion Configuration
@@ -16,13 +14,23 @@ MAX_TOTAL_SIZE_BYTES = MAX_TOTAL_SIZE_MB * 1024 * 1024
 MAX_FILE_SIZE_MB = int(os.environ.get("GITINGEST_MAX_FILE_SIZE_MB", 1))
 MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
 MAX_DIRECTORY_DEPTH = int(os.environ.get("GITINGEST_MAX_DIRECTORY_DEPTH", 10))
+# Threads, shared by all ingestions, used to walk the top-level subdirectories of repositories concurrently
+MAX_WALK_WORKERS = int(os.environ.get("GITINGEST_MAX_WALK_WORKERS", min(32, (os.cpu_count() or 1) * 4)))
+# Repository clones (with their checkouts) allowed to run at the same time
+GIT_CONCURRENCY = int(os.environ.get("GITINGEST_GIT_CONCURRENCY", (os.cpu_count() or 1) * 2))
 
 # GitHub Configuration
 GITHUB_PAT = os.environ.get("GITHUB_PAT")
+# Seconds for which the result of a repository existence check is reused
+REPO_EXISTS_CACHE_TTL = int(os.environ.get("GITINGEST_REPO_EXISTS_CACHE_TTL", 300))
+# Seconds for which a remote branch list is reused before it is fetched (or revalidated) again
+BRANCH_LIST_CACHE_TTL = int(os.environ.get("GITINGEST_BRANCH_LIST_CACHE_TTL", 30))
+# Seconds for which the commit of a repository's default branch is reused before it is revalidated
+HEAD_SHA_CACHE_TTL = int(os.environ.get("GITINGEST_HEAD_SHA_CACHE_TTL", 30))
 
 # Log GitHub PAT status at startup
 if GITHUB_PAT:
-    logger.info(f"GitHub PAT detected: {'*' * 5}{GITHUB_PAT[-4:] if len(GITHUB_PAT) > 4 else 'INVALID TOKEN'}")
+    logger.info("GitHub PAT detected: *****%s", GITHUB_PAT[-4:] if len(GITHUB_PAT) > 4 else "INVALID TOKEN")
     if len(GITHUB_PAT) < 10:
         logger.warning("GitHub PAT appears to be invalid (too short)")
 else:
@@ -30,13 +38,33 @@ else:
     # Log all environment variables (excluding sensitive data)
     safe_env = {k: v if not k.lower().endswith(('key', 'secret', 'token', 'password', 'pat')) else '[REDACTED]' 
                 for k, v in os.environ.items()}
-    logger.info(f"Available environment variables: {safe_env}")
+    logger.info("Available environment variables: %s", safe_env)
 
 # Cloud Upload Configuration (NEW)
 S3_BUCKET_NAME = os.environ.get("GITINGEST_S3_BUCKET", "your-gitingest-bucket-name") # Replace with your actual bucket or keep None
+# Lifetime in seconds of pre-signed URLs for uploaded digests (SigV4 allows at most 7 days). When unset (or not
+# positive), the permanent public URL of the object is returned instead, which requires a publicly readable bucket
+_S3_URL_EXPIRATION = int(os.environ.get("GITINGEST_S3_URL_EXPIRATION") or 0)
+S3_PRESIGNED_URL_EXPIRATION = _S3_URL_EXPIRATION if _S3_URL_EXPIRATION > 0 else None
+# Upload through S3 Transfer Acceleration; the bucket must have it enabled
+S3_USE_ACCELERATE = os.environ.get("GITINGEST_S3_ACCELERATE", "").lower() in ("1", "true", "yes")
 
 OUTPUT_FILE_NAME = "digest.txt"
 
 # Use /tmp directory on Heroku as it's writable
 TMP_BASE_PATH = Path(os.environ.get("TEMP_DIR", "/tmp/gitingest"))
-os.makedirs(TMP_BASE_PATH, exist_ok=True)
+
+
+def ensure_tmp_base() -> Path:
+    """
+    Create the temporary base directory if it does not exist yet.
+
+    This is done on first use rather than at import time, so importing the package has no filesystem side effects.
+
+    Returns
+    -------
+    Path
+        The temporary base directory.
+    """
+    TMP_BASE_PATH.mkdir(parents=True, exist_ok=True)
+    return TMP_BASE_PATH
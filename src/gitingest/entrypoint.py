@@ -9,6 +9,7 @@ from gitingest.cloning import clone_repo
 from gitingest.config import TMP_BASE_PATH
 from gitingest.ingestion import ingest_query
 from gitingest.query_parsing import IngestionQuery, parse_query
+from gitingest.utils.git_utils import http_session_scope
 
 
 async def ingest_async(
@@ -55,6 +56,20 @@ async def ingest_async(
     TypeError
         If `clone_repo` does not return a coroutine, or if the `source` is of an unsupported type.
     """
+    # The shared HTTP session is closed once the last running ingestion is done, before the caller's loop may end
+    async with http_session_scope():
+        return await _ingest_async(source, max_file_size, include_patterns, exclude_patterns, branch, output)
+
+
+async def _ingest_async(
+    source: str,
+    max_file_size: int,
+    include_patterns: Optional[Union[str, Set[str]]],
+    exclude_patterns: Optional[Union[str, Set[str]]],
+    branch: Optional[str],
+    output: Optional[str],
+) -> Tuple[str, str, str]:
+    """Ingest a source as described by `ingest_async`, without managing the shared HTTP session."""
     repo_cloned = False
 
     try:
@@ -83,7 +98,7 @@ async def ingest_async(
 
             repo_cloned = True
 
-        summary, tree, content = ingest_query(query)
+        summary, tree, content = await asyncio.to_thread(ingest_query, query)
 
         if output is not None:
             with open(output, "w", encoding="utf-8") as f:
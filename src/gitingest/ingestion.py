@@ -1,16 +1,19 @@
 """Functions to ingest and analyze a codebase directory or single file."""
 
+import logging
+import os
 import warnings
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 import uuid
 
 from gitingest import config as gitingest_config
-from gitingest.config import MAX_DIRECTORY_DEPTH, MAX_FILES, MAX_TOTAL_SIZE_BYTES
+from gitingest.config import MAX_DIRECTORY_DEPTH, MAX_FILES, MAX_TOTAL_SIZE_BYTES, MAX_WALK_WORKERS
 from gitingest.output_formatters import format_node
 from gitingest.query_parsing import IngestionQuery
 from gitingest.schemas import FileSystemNode, FileSystemNodeType, FileSystemStats
-from gitingest.utils.ingestion_utils import _should_exclude, _should_include
+from gitingest.utils.ingestion_utils import MatchContext, _should_exclude, _should_include
 from gitingest.cloud_uploader import upload_content_to_s3
 
 try:
@@ -18,6 +21,15 @@ try:
 except ImportError:
     import tomli as tomllib
 
+logger = logging.getLogger(__name__)
+
+# Threads shared by all ingestions to walk the top-level subdirectories of a repository ahead of the main walk
+_WALK_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_WALK_WORKERS, thread_name_prefix="gitingest-walk")
+
+
+class _TraversalLimitReached(Exception):
+    """Exception raised to stop the whole traversal once the file count or total size limit is reached."""
+
 
 def ingest_query(query: IngestionQuery) -> Tuple[str, str, str | None]:
     """
@@ -81,23 +93,29 @@ def ingest_query(query: IngestionQuery) -> Tuple[str, str, str | None]:
         )
 
         stats = FileSystemStats()
+        match_context = MatchContext.from_patterns(query.ignore_patterns, query.include_patterns)
 
-        _process_node(
-            node=root_node,
-            query=query,
-            stats=stats,
-        )
+        try:
+            _process_node(
+                node=root_node,
+                query=query,
+                stats=stats,
+                match_context=match_context,
+                executor=_WALK_EXECUTOR,
+            )
+        except _TraversalLimitReached:
+            # The walk stopped early, but every node visited so far has been attached to the tree
+            pass
 
         summary, tree, content = format_node(root_node, query)
 
     # --- Upload to S3 if configured --- START
     content_url: str | None = None
     if gitingest_config.S3_BUCKET_NAME and gitingest_config.S3_BUCKET_NAME != "your-gitingest-bucket-name":
-        # Combine summary, tree, and content for a complete digest upload
-        full_content = f"{summary}\n\n{tree}\n\n{content}"
+        # Upload summary, tree, and content as a complete digest, without joining them first
         object_name = f"digests/{query.slug or 'local'}/{uuid.uuid4()}.txt"
         content_url = upload_content_to_s3(
-            content=full_content,
+            content=(summary, "\n\n", tree, "\n\n", content),
             bucket_name=gitingest_config.S3_BUCKET_NAME,
             object_name=object_name
         )
@@ -141,8 +159,8 @@ def apply_gitingest_file(path: Path, query: IngestionQuery) -> None:
         return
 
     try:
-        with path_gitingest.open("rb") as f:
-            data = tomllib.load(f)
+        # A one-shot read_bytes avoids setting up a buffered reader for this small file
+        data = tomllib.loads(path_gitingest.read_bytes().decode("utf-8"))
     except tomllib.TOMLDecodeError as exc:
         warnings.warn(f"Invalid TOML in {path_gitingest}: {exc}", UserWarning)
         return
@@ -185,10 +203,29 @@ def apply_gitingest_file(path: Path, query: IngestionQuery) -> None:
     return
 
 
+class _DirectoryFrame:
+    """A directory on the explicit stack of `_process_node`, along with its open `os.scandir` iterator."""
+
+    __slots__ = ("node", "entries", "rel_prefix")
+
+    def __init__(self, node: FileSystemNode) -> None:
+        self.node = node
+        self.entries: Optional[Iterator[os.DirEntry]] = None
+        # Relative paths are built from the parent's by string concatenation instead of ``Path.relative_to``
+        self.rel_prefix = "" if node.path_str == "." else node.path_str + os.sep
+
+    def close(self) -> None:
+        """Close the `os.scandir` iterator of the directory, if it was opened."""
+        if self.entries is not None:
+            self.entries.close()  # type: ignore[attr-defined]
+
+
 def _process_node(
     node: FileSystemNode,
     query: IngestionQuery,
     stats: FileSystemStats,
+    match_context: MatchContext,
+    executor: Optional[Executor] = None,
 ) -> None:
     """
     Process a file or directory item within a directory.
@@ -196,6 +233,10 @@ def _process_node(
     This function handles each file or directory item, checking if it should be included or excluded based on the
     provided patterns. It handles symlinks, directories, and files accordingly.
 
+    The directory tree is walked depth-first with an explicit stack of open directories rather than by recursion, so
+    deep trees neither hit the recursion limit nor pay for a Python frame per directory. Entries are still visited in
+    the same order as a recursive walk, which decides what is kept once a limit is reached.
+
     Parameters
     ----------
     node : FileSystemNode
@@ -204,49 +245,285 @@ def _process_node(
         The parsed query object containing information about the repository and query parameters.
     stats : FileSystemStats
         Statistics tracking object for the total file count and size.
+    match_context : MatchContext
+        The include and ignore patterns of the query, compiled once for the whole traversal.
+    executor : Executor, optional
+        If provided, each subdirectory of this node is first walked ahead of time as a separate task on this executor,
+        against a budget of its own (see `_start_subdirectory_walks`). The main walk reuses such a subtree only if
+        walking it in order would have given the same result, and walks it again itself otherwise, so the digest does
+        not depend on thread timing. The tasks walk their subtrees sequentially, so they never wait on the executor
+        they run on.
+
+    Raises
+    ------
+    _TraversalLimitReached
+        If the file count or total size limit is reached. The node and the children processed so far are still
+        attached and totalled before the exception propagates.
     """
+    stack: List[_DirectoryFrame] = [_DirectoryFrame(node)]
+    walks = _start_subdirectory_walks(node, query, stats, match_context, executor) if executor is not None else {}
+    limit_reached = False
 
-    if limit_exceeded(stats, node.depth):
-        return
+    try:
+        while stack:
+            frame = stack[-1]
+
+            if frame.entries is None:
+                if limit_exceeded(stats, frame.node.depth):
+                    if frame.node.depth <= MAX_DIRECTORY_DEPTH:
+                        raise _TraversalLimitReached
+                    # Only this branch is too deep, its siblings are still walked
+                    stack.pop()
+                    _finish_directory(frame, stack)
+                    continue
+                frame.entries = os.scandir(frame.node.path)
+
+            child_directory_node = _scan_directory(frame, query, stats, match_context)
+
+            if child_directory_node is None:
+                stack.pop()
+                _finish_directory(frame, stack)
+            elif frame.node is node and child_directory_node.name in walks:
+                walked_node = _claim_subdirectory_walk(walks.pop(child_directory_node.name), stats)
+                if walked_node is not None:
+                    _add_directory(parent_node=node, child=walked_node)
+                else:
+                    stack.append(_DirectoryFrame(child_directory_node))
+            else:
+                stack.append(_DirectoryFrame(child_directory_node))
+
+    except _TraversalLimitReached:
+        limit_reached = True
+        # Attach the partially walked directories to their parents, innermost first
+        while stack:
+            frame = stack.pop()
+            _finish_directory(frame, stack)
+
+    finally:
+        for frame in stack:
+            frame.close()
+        # Walks the traversal no longer needs are dropped, those already running finish on their own
+        for _, _, future in walks.values():
+            future.cancel()
 
-    for sub_path in node.path.iterdir():
+    node.sort_children()
 
-        if query.ignore_patterns and _should_exclude(sub_path, query.local_path, query.ignore_patterns):
-            continue
+    if limit_reached:
+        raise _TraversalLimitReached
 
-        if query.include_patterns and not _should_include(sub_path, query.local_path, query.include_patterns):
-            continue
 
-        if sub_path.is_symlink():
-            _process_symlink(path=sub_path, parent_node=node, stats=stats, local_path=query.local_path)
-        elif sub_path.is_file():
-            _process_file(path=sub_path, parent_node=node, stats=stats, local_path=query.local_path)
-        elif sub_path.is_dir():
+def _start_subdirectory_walks(
+    node: FileSystemNode,
+    query: IngestionQuery,
+    stats: FileSystemStats,
+    match_context: MatchContext,
+    executor: Executor,
+) -> Dict[str, Tuple[FileSystemNode, FileSystemStats, "Future[None]"]]:
+    """
+    Start walking each subdirectory of a directory on the executor, each against a budget of its own.
+
+    Every subdirectory is walked from fresh totals, as if it were the first one, so the walks neither share nor race
+    for the file count and total size budget. Only the reported limits (and the lock guarding them) are shared with
+    `stats`, so each limit is still logged once per traversal.
+
+    Parameters
+    ----------
+    node : FileSystemNode
+        The directory whose subdirectories are walked.
+    query : IngestionQuery
+        The parsed query object containing information about the repository and query parameters.
+    stats : FileSystemStats
+        Statistics tracking object of the whole traversal.
+    match_context : MatchContext
+        The include and ignore patterns of the query, compiled once for the whole traversal.
+    executor : Executor
+        The executor on which the subdirectories are walked.
 
-            child_directory_node = FileSystemNode(
-                name=sub_path.name,
+    Returns
+    -------
+    Dict[str, Tuple[FileSystemNode, FileSystemStats, Future[None]]]
+        The node, the totals and the task of each subdirectory walk, by subdirectory name.
+    """
+    rel_prefix = _DirectoryFrame(node).rel_prefix
+    walks: Dict[str, Tuple[FileSystemNode, FileSystemStats, "Future[None]"]] = {}
+
+    with os.scandir(node.path) as entries:
+        for entry in entries:
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            rel_path = rel_prefix + entry.name
+            if match_context.ignore and _should_exclude(rel_path, match_context.ignore):
+                continue
+            if match_context.include and not _should_include(rel_path, True, match_context.include):
+                continue
+
+            child = FileSystemNode(
+                name=entry.name,
                 type=FileSystemNodeType.DIRECTORY,
-                path_str=str(sub_path.relative_to(query.local_path)),
-                path=sub_path,
+                path_str=rel_path,
+                path=Path(entry.path),
                 depth=node.depth + 1,
             )
-
-            _process_node(
-                node=child_directory_node,
+            child_stats = FileSystemStats(reported_limits=stats.reported_limits, lock=stats.lock)
+            future = executor.submit(
+                _process_node,
+                node=child,
                 query=query,
+                stats=child_stats,
+                match_context=match_context,
+            )
+            walks[entry.name] = (child, child_stats, future)
+
+    return walks
+
+
+def _claim_subdirectory_walk(
+    walk: Tuple[FileSystemNode, FileSystemStats, "Future[None]"],
+    stats: FileSystemStats,
+) -> Optional[FileSystemNode]:
+    """
+    Wait for a subdirectory walked ahead of time, and add its totals to the traversal if it can be kept as is.
+
+    The subtree is kept only if its own walk was complete and its totals still fit within the remaining budget: a
+    walk in order then checks the limits against smaller totals at every step, and keeps and skips the same files.
+
+    Parameters
+    ----------
+    walk : Tuple[FileSystemNode, FileSystemStats, Future[None]]
+        The node, the totals and the task of the subdirectory walk, as returned by `_start_subdirectory_walks`.
+    stats : FileSystemStats
+        Statistics tracking object of the whole traversal, updated if the subtree is kept.
+
+    Returns
+    -------
+    FileSystemNode, optional
+        The walked subdirectory, or None if it must be walked again in order.
+    """
+    child, child_stats, future = walk
+    try:
+        future.result()
+    except _TraversalLimitReached:
+        return None
+
+    if (
+        stats.total_files + child_stats.total_files >= MAX_FILES
+        or stats.total_size + child_stats.total_size >= MAX_TOTAL_SIZE_BYTES
+    ):
+        return None
+    stats.total_files += child_stats.total_files
+    stats.total_size += child_stats.total_size
+    return child
+
+
+def _finish_directory(frame: _DirectoryFrame, stack: List[_DirectoryFrame]) -> None:
+    """
+    Close a directory popped from the walk stack, then sort it and attach it to its parent.
+
+    The directory the walk started from has no parent on the stack; it is sorted by `_process_node` once the walk is
+    over.
+
+    Parameters
+    ----------
+    frame : _DirectoryFrame
+        The directory popped from the stack.
+    stack : List[_DirectoryFrame]
+        The remaining stack, whose last frame is the parent of the directory.
+    """
+    frame.close()
+    if stack:
+        frame.node.sort_children()
+        _add_directory(parent_node=stack[-1].node, child=frame.node)
+
+
+def _scan_directory(
+    frame: _DirectoryFrame,
+    query: IngestionQuery,
+    stats: FileSystemStats,
+    match_context: MatchContext,
+) -> Optional[FileSystemNode]:
+    """
+    Process the entries of a directory until the next subdirectory is found.
+
+    Files and symlinks are added to the directory node as they are read. The scan stops at the first subdirectory so
+    the walk can descend into it, and resumes from the same `os.scandir` iterator once that subdirectory is done.
+
+    Parameters
+    ----------
+    frame : _DirectoryFrame
+        The directory whose entries are processed, with its open `os.scandir` iterator.
+    query : IngestionQuery
+        The parsed query object containing information about the repository and query parameters.
+    stats : FileSystemStats
+        Statistics tracking object for the total file count and size.
+    match_context : MatchContext
+        The include and ignore patterns of the query, compiled once for the whole traversal.
+
+    Returns
+    -------
+    FileSystemNode, optional
+        The node of the next subdirectory, or None once all entries have been processed.
+
+    Raises
+    ------
+    _TraversalLimitReached
+        If the file count or total size limit is reached.
+    """
+    node = frame.node
+
+    for entry in frame.entries:
+        rel_path = frame.rel_prefix + entry.name
+
+        if match_context.ignore and _should_exclude(rel_path, match_context.ignore):
+            continue
+
+        if match_context.include and not _should_include(rel_path, entry.is_dir(), match_context.include):
+            continue
+
+        sub_path = Path(entry.path)
+
+        # ``DirEntry`` answers these from the cached ``d_type`` and a single ``lstat``
+        if entry.is_symlink():
+            _process_symlink(path=sub_path, rel_path=rel_path, parent_node=node, stats=stats)
+        elif entry.is_file(follow_symlinks=False):
+            _process_file(
+                path=sub_path,
+                rel_path=rel_path,
+                file_size=entry.stat(follow_symlinks=False).st_size,
+                parent_node=node,
                 stats=stats,
             )
-            node.children.append(child_directory_node)
-            node.size += child_directory_node.size
-            node.file_count += child_directory_node.file_count
-            node.dir_count += 1 + child_directory_node.dir_count
+        elif entry.is_dir(follow_symlinks=False):
+            return FileSystemNode(
+                name=entry.name,
+                type=FileSystemNodeType.DIRECTORY,
+                path_str=rel_path,
+                path=sub_path,
+                depth=node.depth + 1,
+            )
         else:
-            print(f"Warning: {sub_path} is an unknown file type, skipping")
+            logger.warning("%s is an unknown file type, skipping", sub_path)
 
-    node.sort_children()
+    return None
+
+
+def _add_directory(parent_node: FileSystemNode, child: FileSystemNode) -> None:
+    """
+    Attach a fully processed directory node to its parent and roll its totals up.
+
+    Parameters
+    ----------
+    parent_node : FileSystemNode
+        The parent directory node.
+    child : FileSystemNode
+        The processed child directory node.
+    """
+    parent_node.children.append(child)
+    parent_node.size += child.size
+    parent_node.file_count += child.file_count
+    parent_node.dir_count += 1 + child.dir_count
 
 
-def _process_symlink(path: Path, parent_node: FileSystemNode, stats: FileSystemStats, local_path: Path) -> None:
+def _process_symlink(path: Path, rel_path: str, parent_node: FileSystemNode, stats: FileSystemStats) -> None:
     """
     Process a symlink in the file system.
 
@@ -256,66 +533,81 @@ def _process_symlink(path: Path, parent_node: FileSystemNode, stats: FileSystemS
     ----------
     path : Path
         The full path of the symlink.
+    rel_path : str
+        The path of the symlink relative to the repository or directory being processed.
     parent_node : FileSystemNode
         The parent directory node.
     stats : FileSystemStats
         Statistics tracking object for the total file count and size.
-    local_path : Path
-        The base path of the repository or directory being processed.
+
+    Raises
+    ------
+    _TraversalLimitReached
+        If the file count or total size limit has already been reached.
     """
     child = FileSystemNode(
         name=path.name,
         type=FileSystemNodeType.SYMLINK,
-        path_str=str(path.relative_to(local_path)),
+        path_str=rel_path,
         path=path,
         depth=parent_node.depth + 1,
     )
+    if limit_exceeded(stats, parent_node.depth):
+        raise _TraversalLimitReached
     stats.total_files += 1
     parent_node.children.append(child)
     parent_node.file_count += 1
 
 
-def _process_file(path: Path, parent_node: FileSystemNode, stats: FileSystemStats, local_path: Path) -> None:
+def _process_file(
+    path: Path,
+    rel_path: str,
+    file_size: int,
+    parent_node: FileSystemNode,
+    stats: FileSystemStats,
+) -> None:
     """
     Process a file in the file system.
 
-    This function checks the file's size, increments the statistics, and reads its content.
-    If the file size exceeds the maximum allowed, it raises an error.
+    This function checks the file's size, increments the statistics, and records the file in the parent's leaf buffer.
+    If the file size would push the total over the maximum allowed, the file is skipped.
 
     Parameters
     ----------
     path : Path
         The full path of the file.
+    rel_path : str
+        The path of the file relative to the repository or directory being processed.
+    file_size : int
+        The size of the file in bytes, taken from the directory entry that yielded it.
     parent_node : FileSystemNode
         The dictionary to accumulate the results.
     stats : FileSystemStats
         Statistics tracking object for the total file count and size.
-    local_path : Path
-        The base path of the repository or directory being processed.
+
+    Raises
+    ------
+    _TraversalLimitReached
+        If the file count or total size limit has already been reached.
+    ValueError
+        If the parent node is not a directory.
     """
-    file_size = path.stat().st_size
+    if parent_node.leaf_buffer is None:
+        raise ValueError(f"Cannot add {rel_path} to {parent_node.path_str}, which is not a directory")
+
+    # Each walk has totals of its own (see `_start_subdirectory_walks`), so they are updated without a lock
+    if limit_exceeded(stats, parent_node.depth):
+        raise _TraversalLimitReached
+
     if stats.total_size + file_size > MAX_TOTAL_SIZE_BYTES:
-        print(f"Skipping file {path}: would exceed total size limit")
+        logger.debug("Skipping file %s: would exceed total size limit", path)
         return
 
     stats.total_files += 1
     stats.total_size += file_size
 
-    if stats.total_files > MAX_FILES:
-        print(f"Maximum file limit ({MAX_FILES}) reached")
-        return
-
-    child = FileSystemNode(
-        name=path.name,
-        type=FileSystemNodeType.FILE,
-        size=file_size,
-        file_count=1,
-        path_str=str(path.relative_to(local_path)),
-        path=path,
-        depth=parent_node.depth + 1,
-    )
-
-    parent_node.children.append(child)
+    # Files are kept in the parent's leaf buffer; their nodes are only built when the output is formatted
+    parent_node.leaf_buffer.append(path.name, file_size, rel_path)
     parent_node.size += file_size
     parent_node.file_count += 1
 
@@ -340,15 +632,40 @@ def limit_exceeded(stats: FileSystemStats, depth: int) -> bool:
         True if any limit has been exceeded, False otherwise.
     """
     if depth > MAX_DIRECTORY_DEPTH:
-        print(f"Maximum depth limit ({MAX_DIRECTORY_DEPTH}) reached")
+        _log_limit_once(stats, "depth", "Maximum depth limit (%d) reached", MAX_DIRECTORY_DEPTH)
         return True
 
     if stats.total_files >= MAX_FILES:
-        print(f"Maximum file limit ({MAX_FILES}) reached")
-        return True  # TODO: end recursion
+        _log_limit_once(stats, "files", "Maximum file limit (%d) reached", MAX_FILES)
+        return True
 
     if stats.total_size >= MAX_TOTAL_SIZE_BYTES:
-        print(f"Maxumum total size limit ({MAX_TOTAL_SIZE_BYTES/1024/1024:.1f}MB) reached")
-        return True  # TODO: end recursion
+        _log_limit_once(
+            stats, "size", "Maximum total size limit (%.1fMB) reached", MAX_TOTAL_SIZE_BYTES / 1024 / 1024
+        )
+        return True
 
     return False
+
+
+def _log_limit_once(stats: FileSystemStats, limit: str, msg: str, *args: object) -> None:
+    """
+    Log that a traversal limit was reached, only the first time it is hit during a traversal.
+
+    Parameters
+    ----------
+    stats : FileSystemStats
+        Statistics tracking object, which records the limits already reported.
+    limit : str
+        The name of the limit that was reached.
+    msg : str
+        The log message, formatted lazily with `args`.
+    *args : object
+        The arguments of the log message.
+    """
+    # Concurrent subdirectory walks share the reported limits, so the set is only read and updated under the lock
+    with stats.lock:
+        if limit in stats.reported_limits:
+            return
+        stats.reported_limits.add(limit)
+    logger.warning(msg, *args)
@@ -105,7 +105,7 @@ def _gather_file_contents(node: FileSystemNode) -> str:
         return node.content_string
 
     # Recursively gather contents of all files under the current directory
-    return "\n".join(_gather_file_contents(child) for child in node.children)
+    return "\n".join(_gather_file_contents(child) for child in node.iter_children())
 
 
 def _create_tree_structure(query: IngestionQuery, node: FileSystemNode, prefix: str = "", is_last: bool = True) -> str:
@@ -147,10 +147,11 @@ def _create_tree_structure(query: IngestionQuery, node: FileSystemNode, prefix:
 
     tree_str += f"{prefix}{current_prefix}{display_name}\n"
 
-    if node.type == FileSystemNodeType.DIRECTORY and node.children:
+    if node.type == FileSystemNodeType.DIRECTORY and (node.children or node.leaf_buffer):
         prefix += "    " if is_last else "│   "
-        for i, child in enumerate(node.children):
-            tree_str += _create_tree_structure(query, node=child, prefix=prefix, is_last=i == len(node.children) - 1)
+        children = list(node.iter_children())
+        for i, child in enumerate(children):
+            tree_str += _create_tree_structure(query, node=child, prefix=prefix, is_last=i == len(children) - 1)
     return tree_str
 
 
@@ -1,6 +1,18 @@
 """This module contains the schemas for the Gitingest package."""
 
-from gitingest.schemas.filesystem_schema import FileSystemNode, FileSystemNodeType, FileSystemStats
+from gitingest.schemas.filesystem_schema import (
+    DirectoryLeafBuffer,
+    FileSystemNode,
+    FileSystemNodeType,
+    FileSystemStats,
+)
 from gitingest.schemas.ingestion_schema import CloneConfig, IngestionQuery
 
-__all__ = ["FileSystemNode", "FileSystemNodeType", "FileSystemStats", "CloneConfig", "IngestionQuery"]
+__all__ = [
+    "DirectoryLeafBuffer",
+    "FileSystemNode",
+    "FileSystemNodeType",
+    "FileSystemStats",
+    "CloneConfig",
+    "IngestionQuery",
+]
@@ -3,11 +3,15 @@
 from __future__ import annotations
 
 import os
+import threading
+from array import array
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from pathlib import Path
+from typing import Callable, Iterator, Optional
 
-from gitingest.utils.file_utils import get_preferred_encodings, is_text_file
+from gitingest.config import MAX_FILE_SIZE_BYTES
+from gitingest.utils.file_utils import get_preferred_encodings, is_binary_chunk, is_text_file
 from gitingest.utils.notebook_utils import process_notebook
 
 SEPARATOR = "=" * 48  # Tiktoken, the tokenizer openai uses, counts 2 tokens if we have more than 48
@@ -28,6 +32,76 @@ class FileSystemStats:
     visited: set[Path] = field(default_factory=set)
     total_files: int = 0
     total_size: int = 0
+    reported_limits: set[str] = field(default_factory=set)
+    # Guards `reported_limits`, which the concurrent walks of the top-level subdirectories share
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+
+def _file_sort_key(name: str) -> tuple[int, str]:
+    # returns the priority order for the sort function, 0 is first
+    # Groups: 0=README, 1=regular file, 2=hidden file, 3=regular dir, 4=hidden dir
+    name = name.lower()
+    if name == "readme.md":
+        return (0, name)
+    return (1 if not name.startswith(".") else 2, name)
+
+
+def _child_sort_key(child: FileSystemNode) -> tuple[int, str]:
+    if child.type == FileSystemNodeType.FILE:
+        return _file_sort_key(child.name)
+    name = child.name.lower()
+    return (3 if not name.startswith(".") else 4, name)
+
+
+@dataclass
+class DirectoryLeafBuffer:
+    """
+    Column-oriented storage for the regular files of a directory.
+
+    Regular files vastly outnumber directories, so instead of one `FileSystemNode` per file a directory keeps the
+    name, size and relative path of its files in parallel arrays. Nodes are only built when the tree is formatted.
+    """
+
+    names: list[str] = field(default_factory=list)
+    sizes: array = field(default_factory=lambda: array("q"))
+    rel_paths: list[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def append(self, name: str, size: int, rel_path: str) -> None:
+        """
+        Add a file to the buffer.
+
+        Parameters
+        ----------
+        name : str
+            The name of the file.
+        size : int
+            The size of the file in bytes.
+        rel_path : str
+            The path of the file relative to the root of the ingestion.
+        """
+        self.names.append(name)
+        self.sizes.append(size)
+        self.rel_paths.append(rel_path)
+
+    def sort(self, key: Callable[[str], tuple[int, str]]) -> None:
+        """
+        Reorder the files of the buffer, keeping the arrays aligned.
+
+        Parameters
+        ----------
+        key : Callable[[str], tuple[int, str]]
+            The sort key, computed from the file name.
+        """
+        keys = list(map(key, self.names))
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        if order == list(range(len(order))):
+            return  # already in order, no need to rebuild the arrays
+        self.names = [self.names[i] for i in order]
+        self.sizes = array("q", (self.sizes[i] for i in order))
+        self.rel_paths = [self.rel_paths[i] for i in order]
 
 
 @dataclass
@@ -47,6 +121,38 @@ class FileSystemNode:  # pylint: disable=too-many-instance-attributes
     dir_count: int = 0
     depth: int = 0
     children: list[FileSystemNode] = field(default_factory=list)
+    # The files of a directory; only directories have one, so file and symlink nodes stay small
+    leaf_buffer: Optional[DirectoryLeafBuffer] = None
+
+    def __post_init__(self) -> None:
+        if self.leaf_buffer is None and self.type == FileSystemNodeType.DIRECTORY:
+            self.leaf_buffer = DirectoryLeafBuffer()
+
+    def iter_children(self) -> Iterator[FileSystemNode]:
+        """
+        Iterate over all children of a directory, building nodes for the files held in `leaf_buffer`.
+
+        Files are yielded first, followed by `children` (subdirectories and symlinks). Once both are sorted
+        with `sort_children`, this is the order in which the children are displayed.
+
+        Yields
+        ------
+        FileSystemNode
+            The next child of the directory.
+        """
+        leaves = self.leaf_buffer
+        if leaves is not None:
+            for name, size, rel_path in zip(leaves.names, leaves.sizes, leaves.rel_paths):
+                yield FileSystemNode(
+                    name=name,
+                    type=FileSystemNodeType.FILE,
+                    path_str=rel_path,
+                    path=self.path / name,
+                    size=size,
+                    file_count=1,
+                    depth=self.depth + 1,
+                )
+        yield from self.children
 
     def sort_children(self) -> None:
         """
@@ -68,17 +174,11 @@ class FileSystemNode:  # pylint: disable=too-many-instance-attributes
         if self.type != FileSystemNodeType.DIRECTORY:
             raise ValueError("Cannot sort children of a non-directory node")
 
-        def _sort_key(child: FileSystemNode) -> tuple[int, str]:
-            # returns the priority order for the sort function, 0 is first
-            # Groups: 0=README, 1=regular file, 2=hidden file, 3=regular dir, 4=hidden dir
-            name = child.name.lower()
-            if child.type == FileSystemNodeType.FILE:
-                if name == "readme.md":
-                    return (0, name)
-                return (1 if not name.startswith(".") else 2, name)
-            return (3 if not name.startswith(".") else 4, name)
-
-        self.children.sort(key=_sort_key)
+        # Files in the leaf buffer always sort before the directories and symlinks in `children`,
+        # so each collection is sorted on its own with keys computed once per name
+        if self.leaf_buffer is not None:
+            self.leaf_buffer.sort(key=_file_sort_key)
+        self.children.sort(key=_child_sort_key)
 
     @property
     def content_string(self) -> str:
@@ -121,6 +221,9 @@ class FileSystemNode:  # pylint: disable=too-many-instance-attributes
         if self.type == FileSystemNodeType.SYMLINK:
             return ""
 
+        if self.size <= MAX_FILE_SIZE_BYTES:
+            return self._read_small_file()
+
         if not is_text_file(self.path):
             return "[Non-text file]"
 
@@ -143,3 +246,39 @@ class FileSystemNode:  # pylint: disable=too-many-instance-attributes
                 return f"Error reading file: {exc}"
 
         return "Error: Unable to decode file with available encodings"
+
+    def _read_small_file(self) -> str:
+        """
+        Read the content of a file with a single `read_bytes` call and decode it in memory.
+
+        This gives the same result as the streaming path in `content`: the binary check is done on the first
+        1024 bytes, the preferred encodings are tried in order, and newlines are translated as in text mode.
+
+        Returns
+        -------
+        str
+            The content of the file, or a placeholder or error message if it is not text or cannot be decoded.
+        """
+        try:
+            data = self.path.read_bytes()
+        except OSError:
+            return "[Non-text file]"
+
+        if is_binary_chunk(data[:1024]):
+            return "[Non-text file]"
+
+        if self.path.suffix == ".ipynb":
+            try:
+                return process_notebook(self.path)
+            except Exception as exc:
+                return f"Error processing notebook: {exc}"
+
+        for encoding in get_preferred_encodings():
+            try:
+                text = data.decode(encoding)
+            except UnicodeError:
+                continue
+            return text.replace("\r\n", "\n").replace("\r", "\n")
+
+        # The streaming path's `is_text_file` tries the same encodings and reports such files as non-text
+        return "[Non-text file]"
@@ -27,6 +27,23 @@ def get_preferred_encodings() -> List[str]:
     return encodings
 
 
+def is_binary_chunk(chunk: bytes) -> bool:
+    """
+    Check the leading bytes of a file for common binary markers.
+
+    Parameters
+    ----------
+    chunk : bytes
+        The first bytes of the file (up to 1024).
+
+    Returns
+    -------
+    bool
+        True if the chunk contains a NUL or 0xFF byte; False otherwise.
+    """
+    return b"\x00" in chunk or b"\xff" in chunk
+
+
 def is_text_file(path: Path) -> bool:
     """
     Determine if the file is likely a text file by trying to decode a small chunk
@@ -55,7 +72,7 @@ def is_text_file(path: Path) -> bool:
         return True
 
     # Check obvious binary bytes
-    if b"\x00" in chunk or b"\xff" in chunk:
+    if is_binary_chunk(chunk):
         return False
 
     # Attempt multiple encodings
@@ -1,16 +1,164 @@
 """Utility functions for interacting with Git repositories."""
 
 import asyncio
+import functools
 import logging
-from typing import List, Tuple
+import os
+import re
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 
-from gitingest.config import GITHUB_PAT
+import aiohttp
+
+try:
+    import aiodns  # pylint: disable=unused-import  # noqa: F401
+
+    _HAS_AIODNS = True
+except ImportError:
+    _HAS_AIODNS = False
+
+from gitingest.config import (
+    BRANCH_LIST_CACHE_TTL,
+    GIT_CONCURRENCY,
+    GITHUB_PAT,
+    HEAD_SHA_CACHE_TTL,
+    REPO_EXISTS_CACHE_TTL,
+)
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-async def run_command(*args: str) -> Tuple[bytes, bytes]:
+# Bounds the number of clones running at once, and the event loop it belongs to (see `get_git_semaphore`)
+_git_semaphore: Optional[asyncio.Semaphore] = None
+_git_semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# Set once `git --version` has succeeded
+_git_installed = False
+
+# Existence check results by normalized URL, with the monotonic time at which they expire
+_repo_exists_cache: Dict[str, Tuple[float, bool]] = {}
+# Existence checks in progress, by normalized URL
+_repo_exists_tasks: Dict[str, "asyncio.Future[bool]"] = {}
+_REPO_EXISTS_CACHE_MAX_SIZE = 1024
+
+# Branch lists by normalized URL, with the monotonic time at which they expire and the GitHub API ETag, if any
+_branch_cache: Dict[str, Tuple[float, Optional[str], List[str]]] = {}
+# Branch listings in progress, by normalized URL
+_branch_list_tasks: Dict[str, "asyncio.Future[List[str]]"] = {}
+_BRANCH_CACHE_MAX_SIZE = 1024
+_REFS_HEADS = b"refs/heads/"
+
+# Commits of the default branch by normalized URL (None if unresolved), with their expiry time and GitHub API ETag
+_head_sha_cache: Dict[str, Tuple[float, Optional[str], Optional[str]]] = {}
+# Lookups of the default branch commit in progress, by normalized URL
+_head_sha_tasks: Dict[str, "asyncio.Future[Optional[str]]"] = {}
+_HEAD_SHA_CACHE_MAX_SIZE = 1024
+
+# Shared HTTP session for repository checks, and the event loop it belongs to
+_http_session: Optional[aiohttp.ClientSession] = None
+_http_session_loop: Optional[asyncio.AbstractEventLoop] = None
+# Number of `http_session_scope` blocks running; the last one to exit closes the shared HTTP session
+_http_session_users = 0
+HTTP_CONNECTION_LIMIT = 100
+HTTP_DNS_CACHE_TTL = 3600  # seconds
+HTTP_WARM_UP_URL = "https://api.github.com/"
+HTTP_WARM_UP_TIMEOUT = 5  # seconds
+GITHUB_BRANCHES_PER_PAGE = 100  # maximum allowed by the GitHub API
+
+# A GitHub repository given as a URL (with or without scheme and host) or as a `user/repo[/subpath]` path
+_GH_URL_RE = re.compile(
+    r"^/?(?:https?://)?(?:github\.com/)?(?P<user>[\w.-]+)/(?P<repo>[\w.-]+?)(?:\.git)?(?:/(?P<sub>.*))?$"
+)
+
+# Branch lists fetched ahead of time by `prefetch_repo_meta` for the current request, by normalized repository URL
+_prefetched_branches: ContextVar[Optional[Dict[str, List[str]]]] = ContextVar("_prefetched_branches", default=None)
+
+
+def parse_github_slug(source: str) -> Optional[Tuple[str, str, str]]:
+    """
+    Extract the owner, repository and subpath of a GitHub repository URL or path.
+
+    Both full URLs (`https://github.com/user/repo/tree/main`) and paths (`/user/repo/tree/main`) are accepted. A
+    trailing `.git` is removed from the repository name.
+
+    Parameters
+    ----------
+    source : str
+        The URL or path to parse.
+
+    Returns
+    -------
+    Tuple[str, str, str], optional
+        The owner, the repository name and the remaining subpath (without leading or trailing slashes, possibly
+        empty), or None if the source does not name a repository.
+    """
+    match = _GH_URL_RE.match(source)
+    if match is None:
+        return None
+    return match["user"], match["repo"], (match["sub"] or "").strip("/")
+
+
+@dataclass(frozen=True)
+class RepoRef:
+    """
+    A GitHub repository parsed once from a URL or path, so it can be passed around without being parsed again.
+
+    Attributes
+    ----------
+    host : str
+        The host of the repository, e.g. "github.com".
+    user : str
+        The owner of the repository.
+    repo : str
+        The name of the repository.
+    subpath : str
+        The path after the repository name, without leading or trailing slashes, possibly empty.
+    """
+
+    __slots__ = ("host", "user", "repo", "subpath")
+
+    host: str
+    user: str
+    repo: str
+    subpath: str
+
+    @property
+    def url(self) -> str:
+        """The URL of the repository, without the subpath."""
+        return f"https://{self.host}/{self.user}/{self.repo}"
+
+
+def parse_repo(source: str) -> Optional[RepoRef]:
+    """
+    Parse a GitHub repository URL or path into a `RepoRef`.
+
+    Parameters
+    ----------
+    source : str
+        The URL or path to parse, in any form accepted by `parse_github_slug`.
+
+    Returns
+    -------
+    RepoRef, optional
+        The parsed repository, or None if the source does not name a repository.
+    """
+    slug = parse_github_slug(source)
+    return RepoRef("github.com", *slug) if slug is not None else None
+
+
+def _repo_url_and_key(repo: Union[RepoRef, str]) -> Tuple[str, str]:
+    """Return the URL of a repository and the normalized form of it under which its metadata is cached."""
+    url = repo.url if isinstance(repo, RepoRef) else repo
+    return url, url.rstrip("/").lower()
+
+
+async def run_command(
+    *args: str,
+    env: Optional[Dict[str, str]] = None,
+    discard_stdout: bool = False,
+) -> Tuple[bytes, bytes]:
     """
     Execute a shell command asynchronously and return (stdout, stderr) bytes.
 
@@ -18,6 +166,11 @@ async def run_command(*args: str) -> Tuple[bytes, bytes]:
     ----------
     *args : str
         The command and its arguments to execute.
+    env : Dict[str, str], optional
+        The environment variables of the command. If None, the current environment is inherited.
+    discard_stdout : bool
+        If True, the standard output of the command is sent to the null device instead of being buffered in memory,
+        and an empty stdout is returned (default is False).
 
     Returns
     -------
@@ -32,128 +185,609 @@ async def run_command(*args: str) -> Tuple[bytes, bytes]:
     # Execute the requested command
     proc = await asyncio.create_subprocess_exec(
         *args,
-        stdout=asyncio.subprocess.PIPE,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.DEVNULL if discard_stdout else asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.PIPE,
+        env=env,
     )
-    stdout, stderr = await proc.communicate()
+    try:
+        stdout, stderr = await proc.communicate()
+    finally:
+        _kill_process(proc)
+
     if proc.returncode != 0:
         error_message = stderr.decode().strip()
         raise RuntimeError(f"Command failed: {' '.join(args)}\nError: {error_message}")
 
-    return stdout, stderr
+    return stdout or b"", stderr
+
+
+async def run_command_lines(*args: str, env: Optional[Dict[str, str]] = None) -> AsyncIterator[bytes]:
+    """
+    Execute a command asynchronously and yield its standard output line by line.
+
+    The lines are yielded as soon as the process writes them, so the caller can parse them without buffering the whole
+    output in memory. The standard error is drained in the background and reported if the command fails.
+
+    Parameters
+    ----------
+    *args : str
+        The command and its arguments to execute.
+    env : Dict[str, str], optional
+        The environment variables of the command. If None, the current environment is inherited.
+
+    Yields
+    ------
+    bytes
+        Each line of the command's standard output, including the trailing newline.
+
+    Raises
+    ------
+    RuntimeError
+        If the command exits with a non-zero status.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env=env,
+    )
+    assert proc.stdout is not None and proc.stderr is not None
+    stderr_task = asyncio.ensure_future(proc.stderr.read())
+    try:
+        async for line in proc.stdout:
+            yield line
+        stderr = await stderr_task
+        returncode = await proc.wait()
+    finally:
+        _kill_process(proc)  # also covers the caller stopping the iteration early
+        stderr_task.cancel()
+
+    if returncode != 0:
+        error_message = stderr.decode().strip()
+        raise RuntimeError(f"Command failed: {' '.join(args)}\nError: {error_message}")
+
+
+def _kill_process(proc: asyncio.subprocess.Process) -> None:
+    """Kill `proc` if it is still running (e.g. after a timeout); asyncio reaps it once it exits."""
+    if proc.returncode is None:
+        proc.kill()
 
 
 async def ensure_git_installed() -> None:
     """
     Ensure Git is installed and accessible on the system.
 
+    `git --version` only runs until it first succeeds; after that the check is a module-level flag lookup.
+
     Raises
     ------
     RuntimeError
         If Git is not installed or not accessible.
     """
+    global _git_installed  # pylint: disable=global-statement
+
+    if _git_installed:
+        return
+
     try:
         await run_command("git", "--version")
     except RuntimeError as exc:
         raise RuntimeError("Git is not installed or not accessible. Please install Git first.") from exc
+    _git_installed = True
 
 
-async def check_repo_exists(url: str) -> bool:
+async def check_repo_exists(repo: Union[RepoRef, str]) -> bool:
     """
     Check if a Git repository exists at the provided URL.
 
+    The answer is cached for `REPO_EXISTS_CACHE_TTL` seconds under the normalized URL, so ingesting the same
+    repository repeatedly does not repeat the HTTP request. Concurrent checks of the same URL share a single request.
+    Failed requests are not cached.
+
     Parameters
     ----------
-    url : str
-        The URL of the Git repository to check.
+    repo : Union[RepoRef, str]
+        The Git repository to check, already parsed or as a URL.
+    Returns
+    -------
+    bool
+        True if the repository exists, False otherwise.
+
+    Raises
+    ------
+    RuntimeError
+        If the request returns an unexpected status code.
+    """
+    _, key = _repo_url_and_key(repo)
+
+    cached = _repo_exists_cache.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+
+    # The cache is only read and written between awaits, so no lock is needed; a check already running for the
+    # same URL on this event loop is awaited instead of sending another request
+    task = _repo_exists_tasks.get(key)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = asyncio.ensure_future(_check_and_cache(repo, key))
+        _repo_exists_tasks[key] = task
+        task.add_done_callback(functools.partial(_forget_task, _repo_exists_tasks, key))
+
+    # Shield the shared task, so a cancelled caller does not cancel the check for the others
+    return await asyncio.shield(task)
+
+
+def _forget_task(tasks: Dict[str, "asyncio.Future[Any]"], key: str, task: "asyncio.Future[Any]") -> None:
+    """Remove a finished lookup from the lookups in progress `tasks`, unless it was already replaced."""
+    if tasks.get(key) is task:
+        del tasks[key]
+
+
+async def _check_and_cache(repo: Union[RepoRef, str], key: str) -> bool:
+    """
+    Check if a repository exists and cache the answer.
+
+    Parameters
+    ----------
+    repo : Union[RepoRef, str]
+        The Git repository to check, already parsed or as a URL.
+    key : str
+        The normalized URL under which the answer is cached.
+
     Returns
     -------
     bool
         True if the repository exists, False otherwise.
+    """
+    exists = await _probe_repo(repo)
+    if exists is None:
+        return False  # likely unreachable or private
+
+    if len(_repo_exists_cache) >= _REPO_EXISTS_CACHE_MAX_SIZE:
+        # Drop the oldest entry, dicts keep insertion order
+        _repo_exists_cache.pop(next(iter(_repo_exists_cache)))
+    _repo_exists_cache[key] = (time.monotonic() + REPO_EXISTS_CACHE_TTL, exists)
+    return exists
+
+
+async def _probe_repo(repo: Union[RepoRef, str]) -> Optional[bool]:
+    """
+    Send a HEAD request for the repository URL (or the GitHub API endpoint of the repository).
+
+    Parameters
+    ----------
+    repo : Union[RepoRef, str]
+        The Git repository to check, already parsed or as a URL.
+
+    Returns
+    -------
+    bool, optional
+        True if the repository exists, False if it does not, or None if the request itself failed.
 
     Raises
     ------
     RuntimeError
-        If the curl command returns an unexpected status code.
+        If the request returns an unexpected status code.
     """
-    curl_cmd = ["curl", "-I"]
-    
+    url, _ = _repo_url_and_key(repo)
+    probe_url = url
+    headers: Dict[str, str] = {}
+
     # Add GitHub PAT if available and URL is from GitHub
     if GITHUB_PAT and "github.com" in url:
-        logger.info(f"GitHub PAT found: {'*' * 5}{GITHUB_PAT[-4:] if GITHUB_PAT else 'None'}")
-        
+        logger.info("GitHub PAT found: *****%s", GITHUB_PAT[-4:])
+        headers["Authorization"] = f"token {GITHUB_PAT}"
+
         # For private repos, use the GitHub API instead of direct access
-        # Extract user and repo from URL
-        parts = url.replace("https://github.com/", "").split("/")
-        if len(parts) >= 2:
-            user = parts[0]
-            repo = parts[1]
+        ref = repo if isinstance(repo, RepoRef) else parse_repo(url)
+        if ref is not None:
             # Use GitHub API to check repo access with PAT
-            api_url = f"https://api.github.com/repos/{user}/{repo}"
-            logger.info(f"Using GitHub API URL: {api_url}")
-            
-            curl_cmd = ["curl", "-I", "-H", f"Authorization: token {GITHUB_PAT}", api_url]
-            logger.info(f"Using GitHub PAT for authentication with API URL: {api_url}")
+            probe_url = f"https://api.github.com/repos/{ref.user}/{ref.repo}"
+            logger.info("Using GitHub PAT for authentication with API URL: %s", probe_url)
         else:
-            logger.warning(f"Could not parse GitHub URL: {url}")
-            curl_cmd.extend(["-H", f"Authorization: token {GITHUB_PAT}"])
-            curl_cmd.append(url)
+            logger.warning("Could not parse GitHub URL: %s", url)
     else:
-        logger.warning(f"No GitHub PAT found or not a GitHub URL: {url}")
+        logger.warning("No GitHub PAT found or not a GitHub URL: %s", url)
         if not GITHUB_PAT:
             logger.warning("GITHUB_PAT environment variable is not set or empty")
-        curl_cmd.append(url)
-    
-    logger.info(f"Checking repo with command: {' '.join(curl_cmd).replace(GITHUB_PAT, '*****') if GITHUB_PAT else ' '.join(curl_cmd)}")
-    
-    proc = await asyncio.create_subprocess_exec(
-        *curl_cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    stdout, stderr = await proc.communicate()
 
-    if proc.returncode != 0:
-        error_stderr = stderr.decode().strip()
-        logger.error(f"Curl command failed with code {proc.returncode}: {error_stderr}")
-        return False  # likely unreachable or private
+    logger.info("Checking repo with HEAD request: %s", probe_url)
 
-    response = stdout.decode()
-    status_line = response.splitlines()[0].strip()
-    logger.info(f"GitHub API response status: {status_line}")
-    parts = status_line.split(" ")
-    if len(parts) >= 2:
-        status_code_str = parts[1]
-        if status_code_str in ("200", "301"):
-            return True
-        if status_code_str in ("302", "404"):
-            # Added for private repos - sometimes GitHub redirects or returns 404 for non-existent or unauthorized repos
-            if "github.com" in url and GITHUB_PAT:
-                logger.info("Got 302/404, trying to clone directly with PAT since we have credentials")
-                return True  # Let's try to clone anyway if we have PAT
-            return False
-    raise RuntimeError(f"Unexpected status line: {status_line}")
-
-
-async def fetch_remote_branch_list(url: str) -> List[str]:
+    session = _get_http_session()
+    try:
+        async with session.head(probe_url, headers=headers, allow_redirects=False) as response:
+            status = response.status
+    except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+        logger.error("HEAD request to %s failed: %r", probe_url, exc)
+        return None  # likely unreachable or private
+
+    logger.info("Repository check response status: %s", status)
+    if status in (200, 301):
+        return True
+    if status in (302, 404):
+        # Added for private repos - sometimes GitHub redirects or returns 404 for non-existent or unauthorized repos
+        if "github.com" in url and GITHUB_PAT:
+            logger.info("Got 302/404, trying to clone directly with PAT since we have credentials")
+            return True  # Let's try to clone anyway if we have PAT
+        return False
+    raise RuntimeError(f"Unexpected status code: {status}")
+
+
+def _get_http_session() -> aiohttp.ClientSession:
+    """
+    Return the shared HTTP session of the running event loop, creating it on first use.
+
+    The session keeps a pool of connections and caches DNS lookups, so repeated checks reuse open connections. Lookups
+    go through `aiodns` when it is installed (it is an optional dependency, `pip install gitingest[dns]`), instead of
+    a thread of the default executor.
+    A session is bound to the event loop it was created on; a new one is created if the loop has changed
+    (e.g. between two `asyncio.run` calls), and the previous one is released with `_discard_http_session`.
+
+    Returns
+    -------
+    aiohttp.ClientSession
+        The shared HTTP session.
+    """
+    global _http_session, _http_session_loop  # pylint: disable=global-statement
+
+    loop = asyncio.get_running_loop()
+    if _http_session is not None and not _http_session.closed and _http_session_loop is not loop:
+        _discard_http_session(_http_session, _http_session_loop)
+    if _http_session is None or _http_session.closed or _http_session_loop is not loop:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_CONNECTION_LIMIT,
+            ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+            resolver=aiohttp.AsyncResolver() if _HAS_AIODNS else None,
+        )
+        _http_session = aiohttp.ClientSession(connector=connector)
+        _http_session_loop = loop
+    return _http_session
+
+
+def _discard_http_session(session: aiohttp.ClientSession, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+    """
+    Release an open HTTP session that belongs to another event loop than the running one.
+
+    The session is closed on its own loop if that loop is still running. A loop that has ended can no longer close
+    it, so a warning is logged instead: the session should have been closed with `close_http_session` (or within
+    `http_session_scope`) before its loop ended.
+    """
+    if loop is not None and loop.is_running():
+        asyncio.run_coroutine_threadsafe(session.close(), loop)
+    else:
+        logger.warning("Dropping an HTTP session left open by an event loop that has ended")
+
+
+async def warm_up_http_session() -> None:
+    """
+    Resolve and connect to the GitHub API ahead of the first request, so it finds a pooled TLS connection.
+
+    Failures are only logged: the first real request then simply pays for the lookup and handshake itself.
+    """
+    session = _get_http_session()
+    try:
+        timeout = aiohttp.ClientTimeout(total=HTTP_WARM_UP_TIMEOUT)
+        async with session.head(HTTP_WARM_UP_URL, timeout=timeout, allow_redirects=False):
+            pass
+    except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+        logger.warning("Failed to warm up the connection to %s: %r", HTTP_WARM_UP_URL, exc)
+
+
+def get_git_semaphore() -> asyncio.Semaphore:
+    """
+    Return the semaphore that bounds the number of clones running at once on the current event loop.
+
+    The clone, sparse-checkout and checkout commands of a repository hold one of its `GIT_CONCURRENCY` slots, so a
+    burst of requests queues instead of forking an unbounded number of git processes. Short commands such as
+    `git --version` or `git ls-remote` are not limited. Like the HTTP session, the semaphore is bound to the event
+    loop it was created on, and a new one is created if the loop has changed (e.g. between two `asyncio.run` calls).
+
+    Returns
+    -------
+    asyncio.Semaphore
+        The semaphore of the running event loop.
+    """
+    global _git_semaphore, _git_semaphore_loop  # pylint: disable=global-statement
+
+    loop = asyncio.get_running_loop()
+    if _git_semaphore is None or _git_semaphore_loop is not loop:
+        _git_semaphore = asyncio.Semaphore(GIT_CONCURRENCY)
+        _git_semaphore_loop = loop
+    return _git_semaphore
+
+
+async def close_http_session() -> None:
+    """
+    Close the shared HTTP session, if one is open.
+    """
+    global _http_session, _http_session_loop  # pylint: disable=global-statement
+
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
+    _http_session_loop = None
+
+
+@asynccontextmanager
+async def http_session_scope() -> AsyncIterator[None]:
+    """
+    Keep the shared HTTP session open for the duration of the block, and close it when the last running block exits.
+
+    Concurrent blocks keep sharing one session, while the caller of the outermost block (e.g. `ingest_async` run in
+    its own event loop) is not left with an open session once it is done.
+    """
+    global _http_session_users  # pylint: disable=global-statement
+
+    _http_session_users += 1
+    try:
+        yield
+    finally:
+        _http_session_users -= 1
+        if _http_session_users == 0:
+            await close_http_session()
+
+
+async def prefetch_repo_meta(
+    repo: Union[RepoRef, str],
+    fetch_branches: bool = True,
+) -> Tuple[Union[bool, BaseException], Union[List[str], BaseException, None]]:
+    """
+    Check that a repository exists and fetch its branches concurrently, ahead of processing a query.
+
+    The existence check is cached by `check_repo_exists`, and the branch list is kept for the current context, so
+    the calls made later while parsing the query and cloning return these results without another request.
+
+    Parameters
+    ----------
+    repo : Union[RepoRef, str]
+        The Git repository, already parsed or as a URL built like the query parser does
+        (`https://{host}/{user}/{repo}`).
+    fetch_branches : bool
+        Whether the branch list is needed, i.e. the query names a branch or commit (default is True).
+
+    Returns
+    -------
+    Tuple[Union[bool, BaseException], Union[List[str], BaseException, None]]
+        The result of the existence check and the branch list (None if not fetched). Either may be the exception
+        raised by the corresponding call instead; failed calls are simply repeated later.
+    """
+    calls = [check_repo_exists(repo)]
+    if fetch_branches:
+        calls.append(fetch_remote_branch_list(repo))
+
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    exists = results[0]
+    branches = results[1] if fetch_branches else None
+
+    if isinstance(branches, list):
+        _, key = _repo_url_and_key(repo)
+        _prefetched_branches.set({**(_prefetched_branches.get() or {}), key: branches})
+
+    return exists, branches
+
+
+async def fetch_remote_branch_list(repo: Union[RepoRef, str]) -> List[str]:
     """
     Fetch the list of branches from a remote Git repository.
+
+    For GitHub repositories, when a GitHub PAT is available, the branches are listed through the GitHub REST API on
+    the shared HTTP session. Otherwise, or if the API request fails, `git ls-remote` is used. The list is cached for
+    `BRANCH_LIST_CACHE_TTL` seconds; once stale, a list obtained from the GitHub API is revalidated with its ETag.
+    Concurrent listings of the same URL share a single request.
+
+    Parameters
+    ----------
+    repo : Union[RepoRef, str]
+        The Git repository to fetch branches from, already parsed or as a URL.
+    Returns
+    -------
+    List[str]
+        A list of branch names available in the remote repository.
+    """
+    url, key = _repo_url_and_key(repo)
+    prefetched = _prefetched_branches.get()
+    if prefetched is not None and key in prefetched:
+        return list(prefetched[key])
+
+    cached = _branch_cache.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        return list(cached[2])
+
+    task = _branch_list_tasks.get(key)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = asyncio.ensure_future(_list_and_cache_branches(repo, url, key))
+        _branch_list_tasks[key] = task
+        task.add_done_callback(functools.partial(_forget_task, _branch_list_tasks, key))
+
+    # Shield the shared task, so a cancelled caller does not cancel the listing for the others
+    return list(await asyncio.shield(task))
+
+
+async def _list_and_cache_branches(repo: Union[RepoRef, str], url: str, key: str) -> List[str]:
+    """
+    List the branches of a remote repository and cache them.
+
     Parameters
     ----------
+    repo : Union[RepoRef, str]
+        The Git repository to fetch branches from, already parsed or as a URL.
     url : str
-        The URL of the Git repository to fetch branches from.
+        The URL of the repository.
+    key : str
+        The normalized URL under which the branches are cached.
+
     Returns
     -------
     List[str]
         A list of branch names available in the remote repository.
     """
-    fetch_branches_command = ["git", "ls-remote", "--heads", url]
-    await ensure_git_installed()
-    stdout, _ = await run_command(*fetch_branches_command)
-    stdout_decoded = stdout.decode()
+    cached = _branch_cache.get(key)  # a stale entry is still revalidated with its ETag
+    etag: Optional[str] = None
+    result = None
+    ref = None
+    if GITHUB_PAT:
+        ref = repo if isinstance(repo, RepoRef) else parse_repo(url) if url.startswith("https://github.com/") else None
+    if ref is not None:
+        result = await _fetch_github_branches(user=ref.user, repo=ref.repo, cached=cached[1:] if cached else None)
+
+    if result is not None:
+        etag, branches = result
+    else:
+        # Protocol v2 lets the server filter the advertised refs down to the branches
+        fetch_branches_command = ["git", "-c", "protocol.version=2", "ls-remote", "--heads", "--refs", url]
+        await ensure_git_installed()
+
+        branches = []
+        env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}  # fail instead of prompting for credentials
+        async for line in run_command_lines(*fetch_branches_command, env=env):
+            # Only the branch name is decoded, not the commit SHA in front of it
+            idx = line.find(_REFS_HEADS)
+            if idx >= 0:
+                branches.append(line[idx + len(_REFS_HEADS) :].rstrip(b"\r\n").decode())
+
+    _branch_cache.pop(key, None)  # re-insert as the newest entry
+    if len(_branch_cache) >= _BRANCH_CACHE_MAX_SIZE:
+        # Drop the oldest entry, dicts keep insertion order
+        _branch_cache.pop(next(iter(_branch_cache)))
+    _branch_cache[key] = (time.monotonic() + BRANCH_LIST_CACHE_TTL, etag, branches)
+    return branches
+
+
+async def _fetch_github_branches(
+    user: str,
+    repo: str,
+    cached: Optional[Tuple[Optional[str], List[str]]] = None,
+) -> Optional[Tuple[Optional[str], List[str]]]:
+    """
+    List the branches of a GitHub repository with the REST API, following the pagination links.
+
+    A listing that fits in a single page is returned with its ETag, which can be passed back in `cached` to make the
+    next request conditional: a 304 response then returns the cached branches without transferring them again.
+
+    Parameters
+    ----------
+    user : str
+        The owner of the repository.
+    repo : str
+        The name of the repository.
+    cached : Tuple[str, List[str]], optional
+        The ETag and branches of a previous listing, if any.
+
+    Returns
+    -------
+    Tuple[str, List[str]], optional
+        The ETag of the listing (None if it spans several pages) and the branch names, or None if a request failed.
+    """
+    session = _get_http_session()
+    headers = {"Authorization": f"token {GITHUB_PAT}", "Accept": "application/vnd.github+json"}
+    if cached is not None and cached[0] is not None:
+        headers["If-None-Match"] = cached[0]
+    next_url: Optional[str] = f"https://api.github.com/repos/{user}/{repo}/branches"
+    params: Optional[Dict[str, int]] = {"per_page": GITHUB_BRANCHES_PER_PAGE}
+    etag: Optional[str] = None
+    branches: List[str] = []
+
+    try:
+        while next_url:
+            async with session.get(next_url, headers=headers, params=params) as response:
+                if response.status == 304 and cached is not None:
+                    return cached
+                if response.status != 200:
+                    logger.warning(
+                        "GitHub API returned %s when listing branches of %s/%s", response.status, user, repo
+                    )
+                    return None
+                branches.extend(branch["name"] for branch in await response.json())
+                next_link = response.links.get("next")
+                next_url = str(next_link["url"]) if next_link else None
+                if params is not None and next_url is None:
+                    etag = response.headers.get("ETag")  # only the first page is revalidated
+                params = None  # the pagination links already carry the query parameters
+                headers.pop("If-None-Match", None)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as exc:
+        logger.warning("Failed to list branches of %s/%s through the GitHub API: %r", user, repo, exc)
+        return None
+
+    return etag, branches
+
+
+async def fetch_github_head_sha(repo: RepoRef) -> Optional[str]:
+    """
+    Resolve the commit that the default branch (HEAD) of a GitHub repository points to, through the REST API.
+
+    The commit is requested on the shared HTTP session (authenticated with the GitHub PAT, if any, so private
+    repositories resolve too) rather than with `git ls-remote`, and cached for `HEAD_SHA_CACHE_TTL` seconds; once
+    stale, it is revalidated with its ETag. Failed lookups are cached as None for the same time, so an unreachable or
+    rate-limited API is not queried on every call. Concurrent lookups of the same repository share a single request.
+
+    Parameters
+    ----------
+    repo : RepoRef
+        The GitHub repository.
+
+    Returns
+    -------
+    str, optional
+        The commit SHA of the default branch, or None if it could not be resolved.
+    """
+    _, key = _repo_url_and_key(repo)
+    cached = _head_sha_cache.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[2]
+
+    task = _head_sha_tasks.get(key)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = asyncio.ensure_future(_resolve_and_cache_head_sha(repo, key))
+        _head_sha_tasks[key] = task
+        task.add_done_callback(functools.partial(_forget_task, _head_sha_tasks, key))
+
+    # Shield the shared task, so a cancelled caller does not cancel the lookup for the others
+    return await asyncio.shield(task)
+
+
+async def _resolve_and_cache_head_sha(repo: RepoRef, key: str) -> Optional[str]:
+    """
+    Resolve the commit of the default branch of a GitHub repository through the REST API and cache it.
+
+    Parameters
+    ----------
+    repo : RepoRef
+        The GitHub repository.
+    key : str
+        The normalized URL under which the commit is cached.
+
+    Returns
+    -------
+    str, optional
+        The commit SHA of the default branch, or None if it could not be resolved.
+    """
+    cached = _head_sha_cache.get(key)  # a stale entry is still revalidated with its ETag
+    session = _get_http_session()
+    headers = {"Accept": "application/vnd.github.sha"}
+    if GITHUB_PAT:
+        headers["Authorization"] = f"token {GITHUB_PAT}"
+    if cached is not None and cached[1] is not None:
+        headers["If-None-Match"] = cached[1]
+    api_url = f"https://api.github.com/repos/{repo.user}/{repo.repo}/commits/HEAD"
+    etag: Optional[str] = None
+    head_sha: Optional[str] = None
+
+    try:
+        async with session.get(api_url, headers=headers) as response:
+            if response.status == 304 and cached is not None:
+                etag, head_sha = cached[1], cached[2]
+            elif response.status == 200:
+                etag = response.headers.get("ETag")
+                head_sha = (await response.text()).strip() or None
+            else:
+                logger.warning("GitHub API returned %s when resolving the HEAD of %s", response.status, key)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+        logger.warning("Failed to resolve the HEAD of %s through the GitHub API: %r", key, exc)
 
-    return [
-        line.split("refs/heads/", 1)[1]
-        for line in stdout_decoded.splitlines()
-        if line.strip() and "refs/heads/" in line
-    ]
+    _head_sha_cache.pop(key, None)  # re-insert as the newest entry
+    if len(_head_sha_cache) >= _HEAD_SHA_CACHE_MAX_SIZE:
+        # Drop the oldest entry, dicts keep insertion order
+        _head_sha_cache.pop(next(iter(_head_sha_cache)))
+    _head_sha_cache[key] = (time.monotonic() + HEAD_SHA_CACHE_TTL, etag, head_sha)
+    return head_sha
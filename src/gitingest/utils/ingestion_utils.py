@@ -1,11 +1,80 @@
 """Utility functions for the ingestion process."""
 
-from fnmatch import fnmatch
-from pathlib import Path
-from typing import Set
+import os
+import re
+from dataclasses import dataclass
+from fnmatch import translate
+from typing import Optional, Pattern, Set
 
 
-def _should_include(path: Path, base_path: Path, include_patterns: Set[str]) -> bool:
+@dataclass(frozen=True)
+class MatchContext:
+    """
+    Compiled include and ignore patterns shared by every node of a single traversal.
+
+    Attributes
+    ----------
+    ignore : Pattern[str], optional
+        A single regular expression matching any of the ignore patterns, or None if there are none.
+    include : Pattern[str], optional
+        A single regular expression matching any of the include patterns, or None if there are none.
+    """
+
+    ignore: Optional[Pattern[str]] = None
+    include: Optional[Pattern[str]] = None
+
+    @classmethod
+    def from_patterns(
+        cls,
+        ignore_patterns: Optional[Set[str]],
+        include_patterns: Optional[Set[str]],
+    ) -> "MatchContext":
+        """
+        Compile the given ignore and include patterns.
+
+        Parameters
+        ----------
+        ignore_patterns : Set[str], optional
+            The patterns of files and directories to exclude.
+        include_patterns : Set[str], optional
+            The patterns of files and directories to include.
+
+        Returns
+        -------
+        MatchContext
+            The compiled patterns, ready to be passed down the traversal.
+        """
+        return cls(
+            ignore=_compile_patterns(ignore_patterns) if ignore_patterns else None,
+            include=_compile_patterns(include_patterns) if include_patterns else None,
+        )
+
+
+def _compile_patterns(patterns: Set[str]) -> Pattern[str]:
+    """
+    Compile a set of shell-style patterns into a single regular expression.
+
+    Matching a path against the result is equivalent to calling `fnmatch` with each pattern in turn, but the patterns
+    are translated and compiled only once per traversal instead of once per path.
+
+    Parameters
+    ----------
+    patterns : Set[str]
+        The shell-style patterns to compile. Empty patterns are ignored.
+
+    Returns
+    -------
+    Pattern[str]
+        A regular expression matching any of the given patterns.
+    """
+    translated = [translate(os.path.normcase(pattern)) for pattern in sorted(patterns) if pattern]
+    if not translated:
+        # No usable pattern: compile an expression that never matches
+        return re.compile(r"(?!)")
+    return re.compile("|".join(translated))
+
+
+def _should_include(rel_path: str, is_dir: bool, include_spec: Pattern[str]) -> bool:
     """
     Determine if the given file or directory path matches any of the include patterns.
 
@@ -14,35 +83,26 @@ def _should_include(path: Path, base_path: Path, include_patterns: Set[str]) ->
 
     Parameters
     ----------
-    path : Path
-        The absolute path of the file or directory to check.
-    base_path : Path
-        The base directory from which the relative path is calculated.
-    include_patterns : Set[str]
-        A set of patterns to check against the relative path.
+    rel_path : str
+        The path of the file or directory to check, relative to the base directory.
+    is_dir : bool
+        Whether the path is a directory, in which case a trailing slash is matched.
+    include_spec : Pattern[str]
+        The compiled include patterns to check against the relative path.
 
     Returns
     -------
     bool
         `True` if the path matches any of the include patterns, `False` otherwise.
     """
-    try:
-        rel_path = path.relative_to(base_path)
-    except ValueError:
-        # If path is not under base_path at all
-        return False
-
-    rel_str = str(rel_path)
-    if path.is_dir():
+    rel_str = rel_path
+    if is_dir:
         rel_str += "/"
 
-    for pattern in include_patterns:
-        if fnmatch(rel_str, pattern):
-            return True
-    return False
+    return include_spec.match(os.path.normcase(rel_str)) is not None
 
 
-def _should_exclude(path: Path, base_path: Path, ignore_patterns: Set[str]) -> bool:
+def _should_exclude(rel_path: str, ignore_spec: Pattern[str]) -> bool:
     """
     Determine if the given file or directory path matches any of the ignore patterns.
 
@@ -52,26 +112,14 @@ def _should_exclude(path: Path, base_path: Path, ignore_patterns: Set[str]) -> b
 
     Parameters
     ----------
-    path : Path
-        The absolute path of the file or directory to check.
-    base_path : Path
-        The base directory from which the relative path is calculated.
-    ignore_patterns : Set[str]
-        A set of patterns to check against the relative path.
+    rel_path : str
+        The path of the file or directory to check, relative to the base directory.
+    ignore_spec : Pattern[str]
+        The compiled ignore patterns to check against the relative path.
 
     Returns
     -------
     bool
         `True` if the path matches any of the ignore patterns, `False` otherwise.
     """
-    try:
-        rel_path = path.relative_to(base_path)
-    except ValueError:
-        # If path is not under base_path at all
-        return True
-
-    rel_str = str(rel_path)
-    for pattern in ignore_patterns:
-        if pattern and fnmatch(rel_str, pattern):
-            return True
-    return False
+    return ignore_spec.match(os.path.normcase(rel_path)) is not None
@@ -1,6 +1,7 @@
 """Main module for the FastAPI application."""
 # Render deployment fix - trigger redeploy
 
+import logging
 import os
 from pathlib import Path
 from typing import Dict
@@ -15,10 +16,19 @@ from slowapi.errors import RateLimitExceeded
 from starlette.middleware.trustedhost import TrustedHostMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 
+# Configure logging once for the application, unless the process that runs it (e.g. a test harness) already did.
+# This happens before the server and gitingest modules are imported, so the messages they log at import time (such as
+# the settings read by `gitingest.config`) are not lost.
+if not logging.root.handlers:
+    logging.basicConfig(level=logging.INFO)
+
+# pylint: disable=wrong-import-position
 from server.routers import index, dynamic
 from server.server_config import templates
 from server.server_utils import lifespan, limiter, rate_limit_exception_handler
 
+# pylint: enable=wrong-import-position
+
 # Load environment variables from .env file
 load_dotenv()
 
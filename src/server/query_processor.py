@@ -1,11 +1,13 @@
 """Process a query by parsing input, cloning a repository, and generating a summary."""
 
-from functools import partial
+import asyncio
+from typing import Any, Dict
 
 from fastapi import Request
 from starlette.templating import _TemplateResponse
 
 from gitingest.cloning import clone_repo
+from gitingest.config import S3_PRESIGNED_URL_EXPIRATION
 from gitingest.ingestion import ingest_query
 from gitingest.query_parsing import IngestionQuery, parse_query
 from server.server_config import EXAMPLE_REPOS, MAX_DISPLAY_SIZE, templates
@@ -46,6 +48,53 @@ async def process_query(
     _TemplateResponse
         Rendered template response containing the processed results or an error message.
 
+    Raises
+    ------
+    ValueError
+        If an invalid pattern type is provided.
+    """
+    context = await build_query_context(
+        input_text,
+        slider_position,
+        pattern_type=pattern_type,
+        pattern=pattern,
+        is_index=is_index,
+    )
+    template = "index.jinja" if is_index else "git.jinja"
+    return templates.TemplateResponse(name=template, context={**context, "request": request})
+
+
+async def build_query_context(
+    input_text: str,
+    slider_position: int,
+    pattern_type: str = "exclude",
+    pattern: str = "",
+    is_index: bool = False,
+) -> Dict[str, Any]:
+    """
+    Run the ingestion pipeline of a query and return the template context of its page, without the request.
+
+    The context only depends on the query, so it can be shared by concurrent requests for the same page, each
+    rendering it with its own request (see `process_query`).
+
+    Parameters
+    ----------
+    input_text : str
+        Input text provided by the user, typically a Git repository URL or slug.
+    slider_position : int
+        Position of the slider, representing the maximum file size in the query.
+    pattern_type : str
+        Type of pattern to use, either "include" or "exclude" (default is "exclude").
+    pattern : str
+        Pattern to include or exclude in the query, depending on the pattern type.
+    is_index : bool
+        Flag indicating whether the request is for the index page (default is False).
+
+    Returns
+    -------
+    Dict[str, Any]
+        The template context, with the processed results or an error message.
+
     Raises
     ------
     ValueError
@@ -67,12 +116,9 @@ async def process_query(
     else:
         raise ValueError(f"Invalid pattern type: {pattern_type}")
 
-    template = "index.jinja" if is_index else "git.jinja"
-    template_response = partial(templates.TemplateResponse, name=template)
     max_file_size = log_slider_to_size(slider_position)
 
-    context = {
-        "request": request,
+    context: Dict[str, Any] = {
         "repo_url": input_text,
         "examples": EXAMPLE_REPOS if is_index else [],
         "default_file_size": slider_position,
@@ -80,6 +126,7 @@ async def process_query(
         "pattern": pattern,
         "content": None,
         "content_url": None,
+        "content_url_expiration": None,
         "error_message": None,
         "upload_failed": False,
         "gitmvp_url": None,
@@ -98,12 +145,14 @@ async def process_query(
 
         clone_config = query.extract_clone_config()
         await clone_repo(clone_config)
-        summary, tree, content_or_url = ingest_query(query)
+        # Walk the repository in a worker thread so the event loop keeps serving other requests
+        summary, tree, content_or_url = await asyncio.to_thread(ingest_query, query)
 
         is_url = isinstance(content_or_url, str) and content_or_url.startswith("http")
 
         if is_url:
             context["content_url"] = content_or_url
+            context["content_url_expiration"] = S3_PRESIGNED_URL_EXPIRATION
             context["content"] = "Content uploaded to cloud storage."
             _print_success(url=query.url, max_file_size=max_file_size, pattern_type=pattern_type, pattern=pattern, summary=summary, uploaded=True)
 
@@ -136,7 +185,7 @@ async def process_query(
             context["error_message"] = (
                 "Repository not found. Please make sure it is public (private repositories will be supported soon)"
             )
-        return template_response(context=context)
+        return context
 
     gitmvp_url = None
     if query.user_name and query.repo_name:
@@ -152,7 +201,7 @@ async def process_query(
         }
     )
 
-    return template_response(context=context)
+    return context
 
 
 def _print_query(url: str, max_file_size: int, pattern_type: str, pattern: str) -> None:
@@ -1,14 +1,41 @@
 """This module defines the dynamic router for handling dynamic path requests."""
 
+import asyncio
+import functools
+import hashlib
+import time
+from typing import Any, Dict, Optional
+
 from fastapi import APIRouter, Form, Request, HTTPException
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
+from starlette.templating import _TemplateResponse
 
-from server.query_processor import process_query
-from server.server_config import templates
+from gitingest.config import S3_PRESIGNED_URL_EXPIRATION
+from gitingest.utils.git_utils import RepoRef, fetch_github_head_sha, parse_repo, prefetch_repo_meta
+from gitingest.utils.query_parser_utils import _is_valid_git_commit_hash
+from server.query_processor import build_query_context, process_query
+from server.server_config import PAGE_CACHE_MAX_AGE, templates
 from server.server_utils import limiter
 
 router = APIRouter()
 
+# Paths requested by browsers and crawlers that are never repositories, answered with 404 before any Git work
+_NON_REPO_PATHS = frozenset(
+    {
+        "favicon.ico",
+        "robots.txt",
+        "sitemap.xml",
+        "apple-touch-icon.png",
+        "apple-touch-icon-precomposed.png",
+        "manifest.json",
+        "ads.txt",
+    }
+)
+_NON_REPO_PREFIXES = ("static/", "assets/", "_next/", ".well-known/")
+
+# Page contexts being built, by repository URL, so that concurrent requests for the same page share one pipeline
+_inflight_queries: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+
 
 @router.get("/github.com/{user}/{repo}")
 async def redirect_github_path(user: str, repo: str):
@@ -19,38 +46,77 @@ async def redirect_github_path(user: str, repo: str):
 
 
 @router.get("/{full_path:path}")
-async def catch_all(request: Request, full_path: str) -> HTMLResponse:
+async def catch_all(request: Request, full_path: str) -> Response:
     """
     Render docs for a GitHub repo based on the provided path, auto-processing if the path matches username/repo.
+
+    Paths that are never repositories (assets, crawler files) get a bare 404, and other paths that are not
+    username/repo[/...] get the form with a 404 status, both without touching the network. Pages pinned to a commit
+    (the default branch, or an explicit commit hash) are sent with `Cache-Control` and a weak ETag derived from that
+    commit, and `If-None-Match` revalidations get a 304. When digest links expire, the ETag also changes with each
+    expiry window, and pages are never kept fresh past the end of the window they were rendered in.
+    """
+    if full_path in _NON_REPO_PATHS or full_path.startswith(_NON_REPO_PREFIXES):
+        raise HTTPException(status_code=404, detail="Not Found")
+    # Only paths that look like username/repo or username/repo/... are treated as GitHub repos
+    repo = parse_repo(full_path)
+    if repo is None:
+        return _render_form(request, full_path, loading=True, error_message=None, status_code=404)
+
+    # Optionally support subpaths (e.g., username/repo/tree/main/path)
+    repo_url = f"{repo.url}/{repo.subpath}" if repo.subpath else repo.url
+    # A revalidation that still matches is answered before the repository is checked or its branches are listed
+    window = _link_window()
+    etag = await _page_etag(repo, repo_url, window)
+    if etag is not None and _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=_cache_headers(etag, window))
+
+    # The prefetch is awaited in this task, so the branch list it keeps for the current context is seen by the query
+    # parser and clone
+    path_type, _, ref_and_path = repo.subpath.partition("/")
+    await prefetch_repo_meta(repo, fetch_branches=path_type in ("tree", "blob") and bool(ref_and_path))
+
+    # Auto-process the repo and render docs
+    try:
+        context = await _query_context_once(repo_url)
+        # The shared context is rendered with each caller's own request; errors are not cached
+        headers = _cache_headers(etag, window) if etag is not None and _is_cacheable(context) else None
+        return templates.TemplateResponse("git.jinja", {**context, "request": request}, headers=headers)
+    except Exception as exc:
+        error_message = str(exc)
+        loading = False
+    # If processing failed, show the form with the error
+    return _render_form(request, repo_url, loading=loading, error_message=error_message)
+
+
+def _render_form(
+    request: Request,
+    repo_url: str,
+    loading: bool,
+    error_message: Optional[str],
+    status_code: int = 200,
+) -> _TemplateResponse:
+    """
+    Render the repository form of `git.jinja` without processing a query.
+
+    Parameters
+    ----------
+    request : Request
+        The incoming request object.
+    repo_url : str
+        The repository URL or path to prefill the form with.
+    loading : bool
+        Whether the page shows the loading state.
+    error_message : str, optional
+        The error to display, if any.
+    status_code : int
+        The HTTP status of the response (default is 200).
+
+    Returns
+    -------
+    _TemplateResponse
+        The rendered form.
     """
-    # If the path looks like username/repo or username/repo/..., treat it as a GitHub repo
-    path_parts = full_path.strip("/").split("/")
-    repo_url = full_path
-    loading = True
-    error_message = None
-    if len(path_parts) >= 2 and path_parts[0] and path_parts[1]:
-        # Only allow valid GitHub repo slugs (no .git, no extra slashes)
-        user, repo = path_parts[0], path_parts[1]
-        # Optionally support subpaths (e.g., username/repo/tree/main/path)
-        subpath = "/".join(path_parts[2:]) if len(path_parts) > 2 else ""
-        github_url = f"https://github.com/{user}/{repo}"
-        if subpath:
-            github_url += f"/{subpath}"
-        repo_url = github_url
-        # Auto-process the repo and render docs
-        try:
-            return await process_query(
-                request,
-                repo_url,
-                243,  # default file size
-                pattern_type="exclude",
-                pattern="",
-                is_index=False,
-            )
-        except Exception as exc:
-            error_message = str(exc)
-            loading = False
-    # If not a valid repo path, just show the form with error (or fallback)
     return templates.TemplateResponse(
         "git.jinja",
         {
@@ -60,9 +126,127 @@ async def catch_all(request: Request, full_path: str) -> HTMLResponse:
             "default_file_size": 243,
             "error_message": error_message,
         },
+        status_code=status_code,
     )
 
 
+async def _query_context_once(repo_url: str) -> Dict[str, Any]:
+    """
+    Build the template context of the page of `repo_url`, or await the one already being built for another request.
+
+    Parameters
+    ----------
+    repo_url : str
+        The URL of the page to render, including the subpath.
+
+    Returns
+    -------
+    Dict[str, Any]
+        The template context of the page (without the request), shared by all the requests that were waiting for it.
+    """
+    task = _inflight_queries.get(repo_url)
+    if task is None:
+        task = asyncio.ensure_future(
+            build_query_context(
+                repo_url,
+                243,  # default file size
+                pattern_type="exclude",
+                pattern="",
+                is_index=False,
+            )
+        )
+        _inflight_queries[repo_url] = task
+        task.add_done_callback(functools.partial(_forget_inflight_query, repo_url))
+
+    # Shield the shared task, so a client that disconnects does not cancel the pipeline for the others
+    return await asyncio.shield(task)
+
+
+def _forget_inflight_query(repo_url: str, task: "asyncio.Future[Dict[str, Any]]") -> None:
+    """Remove a finished pipeline from `_inflight_queries`, unless a newer one has replaced it."""
+    if _inflight_queries.get(repo_url) is task:
+        del _inflight_queries[repo_url]
+
+
+def _is_cacheable(context: Dict[str, Any]) -> bool:
+    """
+    Return whether a page context holds a digest that can be cached under the page's ETag.
+
+    A failed upload still renders a result, with an error message and no digest link, so it is excluded like errors.
+    """
+    return bool(context.get("result")) and not context.get("upload_failed") and not context.get("error_message")
+
+
+def _link_window() -> Optional[int]:
+    """Return the index of the current `S3_PRESIGNED_URL_EXPIRATION`-long window, or None if links do not expire."""
+    if S3_PRESIGNED_URL_EXPIRATION is None:
+        return None
+    return int(time.time() // S3_PRESIGNED_URL_EXPIRATION)
+
+
+async def _page_etag(repo: RepoRef, repo_url: str, window: Optional[int]) -> Optional[str]:
+    """
+    Compute the weak ETag of a repository page from the commit it renders.
+
+    The commit of the default branch comes from `fetch_github_head_sha`, which is cached and never runs git. When
+    digest links expire, the expiry window is part of the ETag, so a page whose link may have expired is not
+    revalidated.
+
+    Parameters
+    ----------
+    repo : RepoRef
+        The GitHub repository, with the subpath of the page (e.g. "tree/<commit>/src", or an empty string).
+    repo_url : str
+        The URL of the rendered page, including the subpath.
+    window : int, optional
+        The current expiry window of digest links (see `_link_window`), or None if they do not expire.
+
+    Returns
+    -------
+    str, optional
+        The ETag, or None if the page is not pinned to a commit that can be resolved cheaply (e.g. a branch page).
+    """
+    path_type, _, ref_and_path = repo.subpath.partition("/")
+    if not repo.subpath:
+        commit = await fetch_github_head_sha(repo)
+    elif path_type in ("tree", "blob") and _is_valid_git_commit_hash(ref_and_path.split("/", 1)[0]):
+        commit = ref_and_path.split("/", 1)[0]
+    else:
+        return None
+
+    if commit is None:
+        return None
+    key = f"{repo_url}:{commit}" if window is None else f"{repo_url}:{commit}:{window}"
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Return whether an `If-None-Match` header lists `etag`, comparing weakly as RFC 9110 requires for GET."""
+    if not if_none_match:
+        return False
+    tags = {_strip_weak(tag.strip()) for tag in if_none_match.split(",")}
+    return "*" in tags or _strip_weak(etag) in tags
+
+
+def _strip_weak(tag: str) -> str:
+    """Return an entity tag without its `W/` weakness indicator."""
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def _cache_headers(etag: str, window: Optional[int]) -> Dict[str, str]:
+    """
+    Return the caching headers of a repository page whose ETag is `etag`.
+
+    When digest links expire, the page stays fresh at most until the end of the expiry window `window`: its link was
+    created during that window, so it is valid until then.
+    """
+    max_age = PAGE_CACHE_MAX_AGE
+    if window is not None and S3_PRESIGNED_URL_EXPIRATION is not None:
+        window_end = (window + 1) * S3_PRESIGNED_URL_EXPIRATION
+        max_age = max(0, min(max_age, int(window_end - time.time())))
+    return {"Cache-Control": f"public, max-age={max_age}", "ETag": etag}
+
+
 @router.post("/{full_path:path}", response_class=HTMLResponse)
 @limiter.limit("10/minute")
 async def process_catch_all(
@@ -6,6 +6,7 @@ from fastapi.templating import Jinja2Templates
 
 MAX_DISPLAY_SIZE: int = 300_000
 DELETE_REPO_AFTER: int = 60 * 60  # In seconds
+PAGE_CACHE_MAX_AGE: int = 5 * 60  # In seconds
 
 
 EXAMPLE_REPOS: List[Dict[str, str]] = [
@@ -14,6 +14,7 @@ from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 
 from gitingest.config import TMP_BASE_PATH
+from gitingest.utils.git_utils import close_http_session, ensure_git_installed, warm_up_http_session
 from server.server_config import DELETE_REPO_AFTER
 
 # Initialize a rate limiter
@@ -63,6 +64,11 @@ async def lifespan(_: FastAPI):
     None
         Yields control back to the FastAPI application while the background task runs.
     """
+    # Fail at startup rather than on the first request if Git is missing
+    await ensure_git_installed()
+    # Open a connection to the GitHub API now, so the first repository check does not pay for DNS and TLS
+    await warm_up_http_session()
+
     task = asyncio.create_task(_remove_old_repositories())
 
     yield
@@ -72,6 +78,7 @@ async def lifespan(_: FastAPI):
         await task
     except asyncio.CancelledError:
         pass
+    await close_http_session()
 
 
 async def _remove_old_repositories():
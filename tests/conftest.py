@@ -1,19 +1,40 @@
 """
 Fixtures for tests.
 
-This file provides shared fixtures for creating sample queries, a temporary directory structure, and a helper function
-to write `.ipynb` notebooks for testing notebook utilities.
+This file provides shared fixtures for creating sample queries, a temporary directory structure, a helper function
+to write `.ipynb` notebooks for testing notebook utilities, and helpers that mock the HTTP session and the streamed
+output of Git commands used by `git_utils`.
 """
 
 import json
 from pathlib import Path
-from typing import Any, Callable, Dict
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+from unittest.mock import AsyncMock, MagicMock
 
+import aiohttp
 import pytest
 
 from gitingest.query_parsing import IngestionQuery
+from gitingest.utils import git_utils
 
 WriteNotebookFunc = Callable[[str, Dict[str, Any]], Path]
+MockHttpSessionFunc = Callable[..., MagicMock]
+AsyncLinesFunc = Callable[..., AsyncIterator[bytes]]
+LsRemoteLinesFunc = Callable[[bytes], AsyncIterator[bytes]]
+
+
+@pytest.fixture(autouse=True)
+def clear_repo_caches() -> None:
+    """
+    Clear the process-wide caches of `check_repo_exists`, `fetch_remote_branch_list` and `fetch_github_head_sha`, so
+    tests that query the same URL stay independent.
+    """
+    git_utils._repo_exists_cache.clear()  # pylint: disable=protected-access
+    git_utils._repo_exists_tasks.clear()  # pylint: disable=protected-access
+    git_utils._branch_cache.clear()  # pylint: disable=protected-access
+    git_utils._branch_list_tasks.clear()  # pylint: disable=protected-access
+    git_utils._head_sha_cache.clear()  # pylint: disable=protected-access
+    git_utils._head_sha_tasks.clear()  # pylint: disable=protected-access
 
 
 @pytest.fixture
@@ -129,3 +150,71 @@ def write_notebook(tmp_path: Path) -> WriteNotebookFunc:
         return notebook_path
 
     return _write_notebook
+
+
+@pytest.fixture
+def mock_http_session() -> MockHttpSessionFunc:
+    """
+    Provide a helper function to build a mock of the shared HTTP session of `git_utils`.
+
+    Returns
+    -------
+    MockHttpSessionFunc
+        A callable that accepts the status that HEAD requests answer with (`status`, 200 by default, or None to make
+        them fail with a connection error) and, optionally, the commit that GET requests return (`head_sha`), and
+        returns the mock session.
+    """
+
+    def _mock_http_session(status: Optional[int] = 200, head_sha: Optional[str] = None) -> MagicMock:
+        session = MagicMock()
+        if status is None:
+            session.head.side_effect = aiohttp.ClientConnectionError()
+        else:
+            session.head.return_value.__aenter__.return_value.status = status
+        if head_sha is not None:
+            found = MagicMock(status=200, headers={})
+            found.text = AsyncMock(return_value=head_sha)
+            session.get.return_value.__aenter__.return_value = found
+        return session
+
+    return _mock_http_session
+
+
+@pytest.fixture
+def async_lines() -> AsyncLinesFunc:
+    """
+    Provide a helper function to stream lines like `run_command_lines` does.
+
+    Returns
+    -------
+    AsyncLinesFunc
+        A callable that accepts the lines of output, as bytes, and returns an async iterator yielding them.
+    """
+
+    async def _async_lines(*lines: bytes) -> AsyncIterator[bytes]:
+        for line in lines:
+            yield line
+
+    return _async_lines
+
+
+@pytest.fixture
+def ls_remote_lines(async_lines: AsyncLinesFunc) -> LsRemoteLinesFunc:
+    """
+    Provide a helper function to stream the output of `git ls-remote` like `run_command_lines` does.
+
+    Parameters
+    ----------
+    async_lines : AsyncLinesFunc
+        The helper provided by the `async_lines` fixture.
+
+    Returns
+    -------
+    LsRemoteLinesFunc
+        A callable that accepts the whole output of `git ls-remote` and returns an async iterator over its lines.
+    """
+
+    def _ls_remote_lines(stdout: bytes) -> AsyncIterator[bytes]:
+        return async_lines(*stdout.splitlines(keepends=True))
+
+    return _ls_remote_lines
@@ -12,6 +12,7 @@ import pytest
 
 from gitingest.query_parsing import _parse_patterns, _parse_remote_repo, parse_query
 from gitingest.utils.ignore_patterns import DEFAULT_IGNORE_PATTERNS
+from tests.conftest import LsRemoteLinesFunc
 
 
 @pytest.mark.asyncio
@@ -144,7 +145,7 @@ async def test_parse_query_invalid_pattern() -> None:
 
 
 @pytest.mark.asyncio
-async def test_parse_url_with_subpaths() -> None:
+async def test_parse_url_with_subpaths(ls_remote_lines: LsRemoteLinesFunc) -> None:
     """
     Test `_parse_remote_repo` with a URL containing branch and subpath.
 
@@ -153,8 +154,10 @@ async def test_parse_url_with_subpaths() -> None:
     Then user, repo, branch, and subpath should be identified correctly.
     """
     url = "https://github.com/user/repo/tree/main/subdir/file"
-    with patch("gitingest.utils.git_utils.run_command", new_callable=AsyncMock) as mock_run_command:
-        mock_run_command.return_value = (b"refs/heads/main\nrefs/heads/dev\nrefs/heads/feature-branch\n", b"")
+    with patch("gitingest.utils.git_utils.run_command_lines") as mock_run_command:
+        mock_run_command.side_effect = lambda *args, **kwargs: ls_remote_lines(
+            b"refs/heads/main\nrefs/heads/dev\nrefs/heads/feature-branch\n"
+        )
         with patch(
             "gitingest.utils.git_utils.fetch_remote_branch_list", new_callable=AsyncMock
         ) as mock_fetch_branches:
@@ -324,7 +327,12 @@ async def test_parse_query_empty_source() -> None:
         ),
     ],
 )
-async def test_parse_url_branch_and_commit_distinction(url: str, expected_branch: str, expected_commit: str) -> None:
+async def test_parse_url_branch_and_commit_distinction(
+    url: str,
+    expected_branch: str,
+    expected_commit: str,
+    ls_remote_lines: LsRemoteLinesFunc,
+) -> None:
     """
     Test `_parse_remote_repo` distinguishing branch vs. commit hash.
 
@@ -332,9 +340,11 @@ async def test_parse_url_branch_and_commit_distinction(url: str, expected_branch
     When `_parse_remote_repo` is called with branch fetching,
     Then the function should correctly set `branch` or `commit` based on the URL content.
     """
-    with patch("gitingest.utils.git_utils.run_command", new_callable=AsyncMock) as mock_run_command:
+    with patch("gitingest.utils.git_utils.run_command_lines") as mock_run_command:
         # Mocking the return value to include 'main' and some additional branches
-        mock_run_command.return_value = (b"refs/heads/main\nrefs/heads/dev\nrefs/heads/feature-branch\n", b"")
+        mock_run_command.side_effect = lambda *args, **kwargs: ls_remote_lines(
+            b"refs/heads/main\nrefs/heads/dev\nrefs/heads/feature-branch\n"
+        )
         with patch(
             "gitingest.utils.git_utils.fetch_remote_branch_list", new_callable=AsyncMock
         ) as mock_fetch_branches:
@@ -440,7 +450,7 @@ async def test_parse_repo_source_with_failed_git_command(url, expected_branch, e
         with pytest.warns(
             RuntimeWarning,
             match="Warning: Failed to fetch branch list: Command failed: "
-            "git ls-remote --heads https://github.com/user/repo",
+            "git -c protocol.version=2 ls-remote --heads --refs https://github.com/user/repo",
         ):
 
             query = await _parse_remote_repo(url)
@@ -461,7 +471,12 @@ async def test_parse_repo_source_with_failed_git_command(url, expected_branch, e
         ("https://github.com/user/repo/blob/fix/page.html", "fix", "/page.html"),
     ],
 )
-async def test_parse_repo_source_with_various_url_patterns(url, expected_branch, expected_subpath):
+async def test_parse_repo_source_with_various_url_patterns(
+    url,
+    expected_branch,
+    expected_subpath,
+    ls_remote_lines: LsRemoteLinesFunc,
+):
     """
     Test `_parse_remote_repo` with various URL patterns.
 
@@ -469,13 +484,12 @@ async def test_parse_repo_source_with_various_url_patterns(url, expected_branch,
     When `_parse_remote_repo` is called with remote branch fetching,
     Then the correct branch/subpath should be set or None if unmatched.
     """
-    with patch("gitingest.utils.git_utils.run_command", new_callable=AsyncMock) as mock_run_command:
+    with patch("gitingest.utils.git_utils.run_command_lines") as mock_run_command:
         with patch(
             "gitingest.utils.git_utils.fetch_remote_branch_list", new_callable=AsyncMock
         ) as mock_fetch_branches:
-            mock_run_command.return_value = (
-                b"refs/heads/feature/fix1\nrefs/heads/main\nrefs/heads/feature-branch\nrefs/heads/fix\n",
-                b"",
+            mock_run_command.side_effect = lambda *args, **kwargs: ls_remote_lines(
+                b"refs/heads/feature/fix1\nrefs/heads/main\nrefs/heads/feature-branch\nrefs/heads/fix\n"
             )
             mock_fetch_branches.return_value = ["feature/fix1", "main", "feature-branch"]
 
@@ -0,0 +1,196 @@
+"""Tests for the GET handler of the dynamic router, which renders the page of a repository path."""
+
+import asyncio
+import importlib
+from typing import Any, AsyncIterator, Dict, List
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from gitingest.utils.git_utils import fetch_remote_branch_list, parse_repo
+from tests.conftest import AsyncLinesFunc, MockHttpSessionFunc
+
+# `server.routers` re-exports the router under the module's name, so the module itself is imported by path
+dynamic = importlib.import_module("server.routers.dynamic")
+
+
+def _mock_request(**headers: str) -> MagicMock:
+    """Return a mock request carrying `headers`."""
+    return MagicMock(headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_catch_all_reuses_prefetched_branch_list(
+    mock_http_session: MockHttpSessionFunc,
+    async_lines: AsyncLinesFunc,
+) -> None:
+    """
+    Test that the branch list prefetched by `catch_all` is seen while the query is processed.
+
+    Given a branch page and a branch list cache that never keeps entries:
+    When `catch_all` renders the page and the query processing lists the branches again,
+    Then it should receive the prefetched list and `git ls-remote` should run only once.
+    """
+    seen: List[List[str]] = []
+
+    async def fake_build_query_context(input_text: str, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        seen.append(await fetch_remote_branch_list("https://github.com/user/repo"))
+        return {"result": True}
+
+    with patch("gitingest.utils.git_utils.GITHUB_PAT", None):
+        with patch("gitingest.utils.git_utils.BRANCH_LIST_CACHE_TTL", 0):
+            with patch("gitingest.utils.git_utils._get_http_session", return_value=mock_http_session()):
+                with patch("gitingest.utils.git_utils.run_command_lines") as mock_exec:
+                    mock_exec.side_effect = lambda *args, **kwargs: async_lines(b"abc123\trefs/heads/main\n")
+                    with patch.object(dynamic, "build_query_context", side_effect=fake_build_query_context):
+                        with patch.object(dynamic, "templates"):
+                            await dynamic.catch_all(_mock_request(), "user/repo/tree/main/src")
+
+    assert seen == [["main"]]
+    assert mock_exec.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_catch_all_etag_changes_with_link_expiry_window(mock_http_session: MockHttpSessionFunc) -> None:
+    """
+    Test that repository pages are revalidated with an ETag that changes with each expiry window of digest links.
+
+    Given digest links that expire after an hour and a repository whose HEAD commit resolves through the API:
+    When the page is rendered, then revalidated in the same window and in the next one,
+    Then the first revalidation should get a 304 fresh only until the end of the window, and the second a new page.
+    """
+    session = mock_http_session(head_sha="a" * 40)
+
+    with patch.object(dynamic, "S3_PRESIGNED_URL_EXPIRATION", 3600):
+        with patch("gitingest.utils.git_utils._get_http_session", return_value=session):
+            with patch.object(dynamic, "build_query_context", new_callable=AsyncMock) as mock_build:
+                mock_build.return_value = {"result": True}
+                with patch.object(dynamic, "templates") as mock_templates:
+                    with patch("server.routers.dynamic.time.time", return_value=3600 * 10 + 3500):
+                        await dynamic.catch_all(_mock_request(), "user/repo")
+                        etag = mock_templates.TemplateResponse.call_args.kwargs["headers"]["ETag"]
+                        response = await dynamic.catch_all(_mock_request(**{"if-none-match": etag}), "user/repo")
+
+                    assert response.status_code == 304
+                    assert response.headers["cache-control"] == "public, max-age=100"
+
+                    with patch("server.routers.dynamic.time.time", return_value=3600 * 11 + 1):
+                        response = await dynamic.catch_all(_mock_request(**{"if-none-match": etag}), "user/repo")
+
+    assert response is mock_templates.TemplateResponse.return_value
+    assert mock_templates.TemplateResponse.call_args.kwargs["headers"]["ETag"] != etag
+    assert mock_build.call_count == 2
+    session.get.assert_called_once()  # the HEAD commit is cached
+
+
+@pytest.mark.asyncio
+async def test_catch_all_renders_shared_context_per_request(mock_http_session: MockHttpSessionFunc) -> None:
+    """
+    Test that concurrent requests for the same page share one pipeline but are each rendered with their own request.
+
+    Given two concurrent requests for the same repository page:
+    When both are handled by `catch_all` while the page context is being built,
+    Then the context should be built once and rendered twice, once with each request.
+    """
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_build_query_context(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+        started.set()
+        await release.wait()
+        return {"result": True}
+
+    first, second = _mock_request(), _mock_request()
+    with patch("gitingest.utils.git_utils._get_http_session", return_value=mock_http_session(head_sha="a" * 40)):
+        with patch.object(dynamic, "build_query_context", side_effect=slow_build_query_context) as mock_build:
+            with patch.object(dynamic, "templates") as mock_templates:
+                tasks = [asyncio.ensure_future(dynamic.catch_all(request, "user/repo")) for request in (first, second)]
+                await started.wait()
+                await asyncio.sleep(0.01)  # let the second request reach the shared pipeline
+                release.set()
+                await asyncio.gather(*tasks)
+
+    mock_build.assert_called_once()
+    rendered_requests = [call.args[1]["request"] for call in mock_templates.TemplateResponse.call_args_list]
+    assert rendered_requests == [first, second]
+
+
+@pytest.mark.asyncio
+async def test_catch_all_answers_matching_revalidation_without_prefetching() -> None:
+    """
+    Test that a revalidation whose ETag still matches is answered before any repository lookup.
+
+    Given a page pinned to a commit and a request whose `If-None-Match` lists the ETag of that page:
+    When `catch_all` handles the request,
+    Then it should return a 304 without checking the repository, listing its branches or building the page.
+    """
+    path = "user/repo/tree/" + "a" * 40
+    repo = parse_repo(path)
+    etag = await dynamic._page_etag(repo, f"{repo.url}/{repo.subpath}", None)  # pylint: disable=protected-access
+
+    with patch.object(dynamic, "S3_PRESIGNED_URL_EXPIRATION", None):
+        with patch.object(dynamic, "prefetch_repo_meta", new_callable=AsyncMock) as mock_prefetch:
+            with patch.object(dynamic, "build_query_context", new_callable=AsyncMock) as mock_build:
+                response = await dynamic.catch_all(_mock_request(**{"if-none-match": etag}), path)
+
+    assert response.status_code == 304
+    mock_prefetch.assert_not_called()
+    mock_build.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_catch_all_does_not_cache_failed_upload() -> None:
+    """
+    Test that a page whose digest could not be uploaded is sent without caching headers.
+
+    Given a page pinned to a commit whose context has a result but reports a failed upload:
+    When `catch_all` renders the page,
+    Then the response should carry neither `Cache-Control` nor an ETag.
+    """
+    context = {"result": True, "upload_failed": True, "error_message": "Content digest generated, but upload failed."}
+
+    with patch.object(dynamic, "prefetch_repo_meta", new_callable=AsyncMock):
+        with patch.object(dynamic, "build_query_context", new_callable=AsyncMock, return_value=context):
+            with patch.object(dynamic, "templates") as mock_templates:
+                await dynamic.catch_all(_mock_request(), "user/repo/tree/" + "a" * 40)
+
+    assert mock_templates.TemplateResponse.call_args.kwargs["headers"] is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["user/repo", "user/repo/tree/main"])
+async def test_catch_all_shares_concurrent_repository_lookups(
+    path: str,
+    mock_http_session: MockHttpSessionFunc,
+    async_lines: AsyncLinesFunc,
+) -> None:
+    """
+    Test that concurrent requests for the same page share the lookups made before the page is built.
+
+    Given three concurrent requests for a repository page or a branch page:
+    When all of them are handled by `catch_all`,
+    Then the HEAD commit should be requested from the API and `git ls-remote` should run at most once.
+    """
+    async def slow_text() -> str:
+        await asyncio.sleep(0.01)  # let the other requests start their own lookups
+        return "a" * 40
+
+    async def slow_lines(*lines: bytes) -> AsyncIterator[bytes]:
+        await asyncio.sleep(0.01)
+        async for line in async_lines(*lines):
+            yield line
+
+    session = mock_http_session(head_sha="a" * 40)
+    session.get.return_value.__aenter__.return_value.text = slow_text
+
+    with patch("gitingest.utils.git_utils.GITHUB_PAT", None):
+        with patch("gitingest.utils.git_utils._get_http_session", return_value=session):
+            with patch("gitingest.utils.git_utils.run_command_lines") as mock_exec:
+                mock_exec.side_effect = lambda *args, **kwargs: slow_lines(b"abc123\trefs/heads/main\n")
+                with patch.object(dynamic, "build_query_context", new_callable=AsyncMock, return_value={}):
+                    with patch.object(dynamic, "templates"):
+                        await asyncio.gather(*(dynamic.catch_all(_mock_request(), path) for _ in range(3)))
+
+    assert session.get.call_count == (0 if "/tree/" in path else 1)
+    assert mock_exec.call_count == (1 if "/tree/" in path else 0)
+    session.head.assert_called_once()
@@ -5,10 +5,18 @@ These tests validate directory scanning, file content extraction, notebook handl
 including filtering patterns and subpaths.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
 from pathlib import Path
+from typing import List
+from unittest.mock import patch
 
-from gitingest.ingestion import ingest_query
+import pytest
+
+from gitingest.ingestion import _process_file, _process_node, _TraversalLimitReached, ingest_query
 from gitingest.query_parsing import IngestionQuery
+from gitingest.schemas import FileSystemNode, FileSystemNodeType, FileSystemStats
+from gitingest.utils.ingestion_utils import MatchContext
 
 
 def test_run_ingest_query(temp_directory: Path, sample_query: IngestionQuery) -> None:
@@ -39,8 +47,199 @@ def test_run_ingest_query(temp_directory: Path, sample_query: IngestionQuery) ->
     assert "dir2/file_dir2.txt" in content
 
 
+def test_process_node_with_executor(temp_directory: Path, sample_query: IngestionQuery) -> None:
+    """
+    Test that walking subdirectories on an executor builds the same tree as a sequential walk.
+
+    Given a directory with nested subdirectories:
+    When `_process_node` is called with and without a thread pool executor,
+    Then both walks should produce the same totals and the same ordered tree.
+    """
+    sample_query.local_path = temp_directory
+    match_context = MatchContext.from_patterns(sample_query.ignore_patterns, sample_query.include_patterns)
+
+    def _walk(executor=None) -> FileSystemNode:
+        root = FileSystemNode(name="", type=FileSystemNodeType.DIRECTORY, path_str=".", path=temp_directory)
+        _process_node(root, sample_query, FileSystemStats(), match_context, executor=executor)
+        return root
+
+    def _flatten(node: FileSystemNode) -> List[str]:
+        return [node.path_str] + [path for child in node.iter_children() for path in _flatten(child)]
+
+    sequential = _walk()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        concurrent = _walk(executor)
+
+    assert concurrent.file_count == sequential.file_count == 8
+    assert concurrent.dir_count == sequential.dir_count == 4
+    assert concurrent.size == sequential.size
+    assert _flatten(concurrent) == _flatten(sequential)
+
+
+def test_process_node_stops_at_file_limit(temp_directory: Path, sample_query: IngestionQuery) -> None:
+    """
+    Test that the traversal stops as soon as the maximum number of files is reached.
+
+    Given a directory with more files than the file limit:
+    When `_process_node` walks it,
+    Then it should raise `_TraversalLimitReached` and the tree should hold exactly the files counted so far.
+    """
+    sample_query.local_path = temp_directory
+    match_context = MatchContext.from_patterns(sample_query.ignore_patterns, sample_query.include_patterns)
+    root = FileSystemNode(name="", type=FileSystemNodeType.DIRECTORY, path_str=".", path=temp_directory)
+    stats = FileSystemStats()
+
+    with patch("gitingest.ingestion.MAX_FILES", 3):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            with pytest.raises(_TraversalLimitReached):
+                _process_node(root, sample_query, stats, match_context, executor=executor)
+
+    assert stats.total_files == 3
+    assert root.file_count == 3
+
+
+def test_process_node_with_executor_keeps_files_in_walk_order(tmp_path: Path, sample_query: IngestionQuery) -> None:
+    """
+    Test that the files kept once the file limit is reached do not depend on the subdirectories walked concurrently.
+
+    Given six subdirectories of 20 files each and a file limit of 50:
+    When `_process_node` walks them with a thread pool executor several times,
+    Then every walk should keep the same files as a sequential walk.
+    """
+    for i in range(6):
+        directory = tmp_path / f"d{i}"
+        directory.mkdir()
+        for j in range(20):
+            (directory / f"f{j:02d}.txt").write_text("x")
+    sample_query.local_path = tmp_path
+    match_context = MatchContext.from_patterns(sample_query.ignore_patterns, sample_query.include_patterns)
+
+    def _walk(executor=None) -> List[str]:
+        root = FileSystemNode(name="", type=FileSystemNodeType.DIRECTORY, path_str=".", path=tmp_path)
+        with pytest.raises(_TraversalLimitReached):
+            _process_node(root, sample_query, FileSystemStats(), match_context, executor=executor)
+        return sorted(child.path_str for directory in root.iter_children() for child in directory.iter_children())
+
+    with patch("gitingest.ingestion.MAX_FILES", 50):
+        sequential = _walk()
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            concurrent = [_walk(executor) for _ in range(5)]
+
+    assert len(sequential) == 50
+    assert all(walk == sequential for walk in concurrent)
+
+
+def test_process_node_stores_files_in_leaf_buffer(temp_directory: Path, sample_query: IngestionQuery) -> None:
+    """
+    Test that regular files are stored in the leaf buffer of their directory rather than as child nodes.
+
+    Given a directory containing files and subdirectories:
+    When `_process_node` walks it,
+    Then `children` should hold only the subdirectories and `iter_children` should yield the files first, sorted.
+    """
+    sample_query.local_path = temp_directory
+    match_context = MatchContext.from_patterns(sample_query.ignore_patterns, sample_query.include_patterns)
+    root = FileSystemNode(name="", type=FileSystemNodeType.DIRECTORY, path_str=".", path=temp_directory)
+
+    _process_node(root, sample_query, FileSystemStats(), match_context)
+
+    assert all(child.type == FileSystemNodeType.DIRECTORY for child in root.children)
+    assert root.leaf_buffer.names == ["file1.txt", "file2.py"]
+    assert list(root.leaf_buffer.sizes) == [(temp_directory / name).stat().st_size for name in root.leaf_buffer.names]
+
+    children = list(root.iter_children())
+    assert [child.name for child in children] == ["file1.txt", "file2.py", "dir1", "dir2", "src"]
+    assert children[0].type == FileSystemNodeType.FILE
+    assert children[0].path == temp_directory / "file1.txt"
+    assert children[0].depth == root.depth + 1
+    assert children[0].leaf_buffer is None  # only directories allocate a leaf buffer
+
+
+def test_process_file_rejects_file_parent(temp_directory: Path) -> None:
+    """
+    Test that a file cannot be recorded under a node that is not a directory.
+
+    Given a file node, which has no leaf buffer:
+    When `_process_file` is called with it as the parent,
+    Then a ValueError should be raised and the totals should be left unchanged.
+    """
+    path = temp_directory / "file1.txt"
+    parent = FileSystemNode(name="file1.txt", type=FileSystemNodeType.FILE, path_str="file1.txt", path=path)
+    stats = FileSystemStats()
+
+    with pytest.raises(ValueError, match="not a directory"):
+        _process_file(path=path, rel_path="file1.txt", file_size=1, parent_node=parent, stats=stats)
+
+    assert stats.total_files == 0
+    assert parent.file_count == 0
+
+
+@pytest.mark.parametrize(
+    "rel_path",
+    ["file.pyc", "src/file.pyc", "__pycache__", "src/__pycache__", "build/", "src/main.py", ".git", "docs/readme.md"],
+)
+def test_match_context_agrees_with_fnmatch(rel_path: str) -> None:
+    """
+    Test that the compiled patterns of `MatchContext` match exactly the paths `fnmatch` would match.
+
+    Given a set of ignore patterns and a relative path:
+    When the patterns are compiled into a `MatchContext`,
+    Then the compiled expression should match the path if and only if one of the patterns does.
+    """
+    patterns = {"*.pyc", "__pycache__", "build/*", "docs/*.md", ".git", ""}
+    match_context = MatchContext.from_patterns(ignore_patterns=patterns, include_patterns=None)
+
+    assert match_context.include is None
+    expected = any(pattern and fnmatch(rel_path, pattern) for pattern in patterns)
+    assert (match_context.ignore.match(rel_path) is not None) is expected
+
+
 # TODO: Additional tests:
 # - Multiple include patterns, e.g. ["*.txt", "*.py"] or ["/src/*", "*.txt"].
 # - Edge cases with weird file names or deep subdirectory structures.
 # TODO : def test_include_txt_pattern
 # TODO : def test_include_nonexistent_extension
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b"", b"line one\r\nline two\rline three\n", "café naïve".encode("utf-8"), b"\x00\x01binary", b"\xff\xfe"],
+)
+def test_file_content_matches_streaming_read(tmp_path: Path, data: bytes) -> None:
+    """
+    Test that reading a small file in one call gives the same content as the streaming read of large files.
+
+    Given a file with text, mixed newlines, non-ASCII characters or binary bytes:
+    When `content` is read below and above the `MAX_FILE_SIZE_BYTES` threshold,
+    Then both reads should return the same string.
+    """
+    path = tmp_path / "file.txt"
+    path.write_bytes(data)
+    node = FileSystemNode(name=path.name, type=FileSystemNodeType.FILE, path_str=path.name, path=path, size=len(data))
+
+    small_read = node.content
+    with patch("gitingest.schemas.filesystem_schema.MAX_FILE_SIZE_BYTES", -1):
+        streaming_read = node.content
+
+    assert small_read == streaming_read
+
+
+def test_file_content_reports_undecodable_file_as_non_text(tmp_path: Path) -> None:
+    """
+    Test that a file no preferred encoding can decode is reported as a non-text file, whatever its size.
+
+    Given a file whose bytes are not valid UTF-8 on a platform whose only preferred encoding is UTF-8:
+    When `content` is read below and above the `MAX_FILE_SIZE_BYTES` threshold,
+    Then both reads should return the "[Non-text file]" placeholder, as `is_text_file` reports for such files.
+    """
+    path = tmp_path / "file.txt"
+    path.write_bytes("café".encode("latin-1"))
+    node = FileSystemNode(name=path.name, type=FileSystemNodeType.FILE, path_str=path.name, path=path, size=5)
+
+    with patch("gitingest.utils.file_utils.get_preferred_encodings", return_value=["utf-8"]):
+        with patch("gitingest.schemas.filesystem_schema.get_preferred_encodings", return_value=["utf-8"]):
+            small_read = node.content
+            with patch("gitingest.schemas.filesystem_schema.MAX_FILE_SIZE_BYTES", -1):
+                streaming_read = node.content
+
+    assert small_read == streaming_read == "[Non-text file]"
@@ -7,14 +7,33 @@ and handling edge cases such as nonexistent URLs, timeouts, redirects, and speci
 
 import asyncio
 import os
+import re
+import sys
 from pathlib import Path
-from unittest.mock import AsyncMock, patch
+from typing import Optional
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import aiohttp
 import pytest
 
+from gitingest import cloning
 from gitingest.cloning import check_repo_exists, clone_repo
 from gitingest.schemas import CloneConfig
+from gitingest.utils import git_utils
 from gitingest.utils.exceptions import AsyncTimeoutError
+from gitingest.utils.git_utils import (
+    RepoRef,
+    fetch_github_head_sha,
+    fetch_remote_branch_list,
+    get_git_semaphore,
+    http_session_scope,
+    parse_github_slug,
+    parse_repo,
+    prefetch_repo_meta,
+    run_command_lines,
+)
+from gitingest.utils.timeout_wrapper import async_timeout
+from tests.conftest import AsyncLinesFunc, MockHttpSessionFunc
 
 
 @pytest.mark.asyncio
@@ -97,33 +116,72 @@ async def test_clone_nonexistent_repository() -> None:
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
-    "mock_stdout, return_code, expected",
+    "status, expected",
     [
-        (b"HTTP/1.1 200 OK\n", 0, True),  # Existing repo
-        (b"HTTP/1.1 404 Not Found\n", 0, False),  # Non-existing repo
-        (b"HTTP/1.1 200 OK\n", 1, False),  # Failed request
+        (200, True),  # Existing repo
+        (404, False),  # Non-existing repo
+        (None, False),  # Failed request
     ],
 )
-async def test_check_repo_exists(mock_stdout: bytes, return_code: int, expected: bool) -> None:
+async def test_check_repo_exists(
+    status: Optional[int],
+    expected: bool,
+    mock_http_session: MockHttpSessionFunc,
+) -> None:
     """
-    Test the `_check_repo_exists` function with different Git HTTP responses.
+    Test the `check_repo_exists` function with different HTTP responses.
 
-    Given various stdout lines and return codes:
-    When `_check_repo_exists` is called,
+    Given various response status codes and a failing request:
+    When `check_repo_exists` is called,
     Then it should correctly indicate whether the repository exists.
     """
     url = "https://github.com/user/repo"
+    session = mock_http_session(status)
+
+    with patch("gitingest.utils.git_utils.GITHUB_PAT", None):
+        with patch("gitingest.utils.git_utils._get_http_session", return_value=session):
+            repo_exists = await check_repo_exists(url)
+
+    assert repo_exists is expected
+    session.head.assert_called_once_with(url, headers={}, allow_redirects=False)
+
+
+@pytest.mark.asyncio
+async def test_check_repo_exists_is_cached(mock_http_session: MockHttpSessionFunc) -> None:
+    """
+    Test that `check_repo_exists` reuses its answer for the same URL.
+
+    Given a repository that exists:
+    When `check_repo_exists` is called twice with the same URL,
+    Then only the first call should send a request.
+    """
+    url = "https://github.com/user/repo"
+    session = mock_http_session(200)
+
+    with patch("gitingest.utils.git_utils._get_http_session", return_value=session):
+        assert await check_repo_exists(url) is True
+        assert await check_repo_exists(url) is True
+
+    assert session.head.call_count == 1
+
 
-    with patch("asyncio.create_subprocess_exec", new_callable=AsyncMock) as mock_exec:
-        mock_process = AsyncMock()
-        # Mock the subprocess output
-        mock_process.communicate.return_value = (mock_stdout, b"")
-        mock_process.returncode = return_code
-        mock_exec.return_value = mock_process
+@pytest.mark.asyncio
+async def test_check_repo_exists_shares_concurrent_checks(mock_http_session: MockHttpSessionFunc) -> None:
+    """
+    Test that concurrent checks of the same repository send a single request.
+
+    Given URLs that differ only by case and a trailing slash:
+    When `check_repo_exists` is called for all of them concurrently,
+    Then they should share one request and the same answer.
+    """
+    urls = ["https://github.com/user/repo", "https://github.com/User/Repo/", "https://github.com/USER/repo"]
+    session = mock_http_session(200)
 
-        repo_exists = await check_repo_exists(url)
+    with patch("gitingest.utils.git_utils._get_http_session", return_value=session):
+        results = await asyncio.gather(*(check_repo_exists(url) for url in urls))
 
-        assert repo_exists is expected
+    assert results == [True, True, True]
+    assert session.head.call_count == 1
 
 
 @pytest.mark.asyncio
@@ -143,12 +201,15 @@ async def test_clone_with_custom_branch() -> None:
             mock_exec.assert_called_once_with(
                 "git",
                 "clone",
+                "--quiet",
                 "--single-branch",
                 "--depth=1",
                 "--branch",
                 "feature-branch",
                 clone_config.url,
                 clone_config.local_path,
+                env=None,
+                discard_stdout=True,
             )
 
 
@@ -192,10 +253,13 @@ async def test_clone_default_shallow_clone() -> None:
             mock_exec.assert_called_once_with(
                 "git",
                 "clone",
+                "--quiet",
                 "--single-branch",
                 "--depth=1",
                 clone_config.url,
                 clone_config.local_path,
+                env=None,
+                discard_stdout=True,
             )
 
 
@@ -218,12 +282,23 @@ async def test_clone_commit_without_branch() -> None:
             await clone_repo(clone_config)
 
             assert mock_exec.call_count == 2  # Clone and checkout calls
-            mock_exec.assert_any_call("git", "clone", "--single-branch", clone_config.url, clone_config.local_path)
+            mock_exec.assert_any_call(
+                "git",
+                "clone",
+                "--quiet",
+                "--single-branch",
+                "--filter=blob:none",
+                "--no-checkout",
+                clone_config.url,
+                clone_config.local_path,
+                env=None,
+                discard_stdout=True,
+            )
             mock_exec.assert_any_call("git", "-C", clone_config.local_path, "checkout", clone_config.commit)
 
 
 @pytest.mark.asyncio
-async def test_check_repo_exists_with_redirect() -> None:
+async def test_check_repo_exists_with_redirect(mock_http_session: MockHttpSessionFunc) -> None:
     """
     Test `check_repo_exists` when a redirect (302) is returned.
 
@@ -232,19 +307,15 @@ async def test_check_repo_exists_with_redirect() -> None:
     Then it should return `False`, indicating the repo is inaccessible.
     """
     url = "https://github.com/user/repo"
-    with patch("asyncio.create_subprocess_exec", new_callable=AsyncMock) as mock_exec:
-        mock_process = AsyncMock()
-        mock_process.communicate.return_value = (b"HTTP/1.1 302 Found\n", b"")
-        mock_process.returncode = 0  # Simulate successful request
-        mock_exec.return_value = mock_process
-
-        repo_exists = await check_repo_exists(url)
+    with patch("gitingest.utils.git_utils.GITHUB_PAT", None):
+        with patch("gitingest.utils.git_utils._get_http_session", return_value=mock_http_session(302)):
+            repo_exists = await check_repo_exists(url)
 
-        assert repo_exists is False
+    assert repo_exists is False
 
 
 @pytest.mark.asyncio
-async def test_check_repo_exists_with_permanent_redirect() -> None:
+async def test_check_repo_exists_with_permanent_redirect(mock_http_session: MockHttpSessionFunc) -> None:
     """
     Test `check_repo_exists` when a permanent redirect (301) is returned.
 
@@ -253,15 +324,11 @@ async def test_check_repo_exists_with_permanent_redirect() -> None:
     Then it should return `True`, indicating the repo may exist at the new location.
     """
     url = "https://github.com/user/repo"
-    with patch("asyncio.create_subprocess_exec", new_callable=AsyncMock) as mock_exec:
-        mock_process = AsyncMock()
-        mock_process.communicate.return_value = (b"HTTP/1.1 301 Found\n", b"")
-        mock_process.returncode = 0  # Simulate successful request
-        mock_exec.return_value = mock_process
+    with patch("gitingest.utils.git_utils.GITHUB_PAT", None):
+        with patch("gitingest.utils.git_utils._get_http_session", return_value=mock_http_session(301)):
+            repo_exists = await check_repo_exists(url)
 
-        repo_exists = await check_repo_exists(url)
-
-        assert repo_exists
+    assert repo_exists
 
 
 @pytest.mark.asyncio
@@ -328,12 +395,15 @@ async def test_clone_branch_with_slashes(tmp_path):
             mock_exec.assert_called_once_with(
                 "git",
                 "clone",
+                "--quiet",
                 "--single-branch",
                 "--depth=1",
                 "--branch",
                 "fix/in-operator",
                 clone_config.url,
                 clone_config.local_path,
+                env=None,
+                discard_stdout=True,
             )
 
 
@@ -363,10 +433,13 @@ async def test_clone_creates_parent_directory(tmp_path: Path) -> None:
             mock_exec.assert_called_once_with(
                 "git",
                 "clone",
+                "--quiet",
                 "--single-branch",
                 "--depth=1",
                 clone_config.url,
                 str(nested_path),
+                env=None,
+                discard_stdout=True,
             )
 
 
@@ -388,17 +461,24 @@ async def test_clone_with_specific_subpath() -> None:
             # Verify the clone command includes sparse checkout flags
             mock_exec.assert_any_call(
                 "git",
+                "-c",
+                "core.sparseCheckoutCone=true",
                 "clone",
+                "--quiet",
                 "--single-branch",
                 "--filter=blob:none",
                 "--sparse",
                 "--depth=1",
                 clone_config.url,
                 clone_config.local_path,
+                env=None,
+                discard_stdout=True,
             )
 
             # Verify the sparse-checkout command sets the correct path
-            mock_exec.assert_any_call("git", "-C", clone_config.local_path, "sparse-checkout", "set", "src/docs")
+            mock_exec.assert_any_call(
+                "git", "-C", clone_config.local_path, "sparse-checkout", "set", "--cone", "src/docs"
+            )
 
             assert mock_exec.call_count == 2
 
@@ -427,24 +507,327 @@ async def test_clone_with_commit_and_subpath() -> None:
             # Verify the clone command includes sparse checkout flags
             mock_exec.assert_any_call(
                 "git",
+                "-c",
+                "core.sparseCheckoutCone=true",
                 "clone",
+                "--quiet",
                 "--single-branch",
                 "--filter=blob:none",
                 "--sparse",
+                "--no-checkout",
                 clone_config.url,
                 clone_config.local_path,
+                env=None,
+                discard_stdout=True,
             )
 
             # Verify the sparse-checkout command sets the correct path
             mock_exec.assert_any_call(
-                "git",
-                "-C",
-                clone_config.local_path,
-                "sparse-checkout",
-                "set",
-                "src/docs",
-                "checkout",
-                clone_config.commit,
+                "git", "-C", clone_config.local_path, "sparse-checkout", "set", "--cone", "src/docs"
             )
 
-            assert mock_exec.call_count == 2
+            # Verify the commit is checked out separately, after the sparse-checkout paths are set
+            mock_exec.assert_called_with("git", "-C", clone_config.local_path, "checkout", clone_config.commit)
+
+            assert mock_exec.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_clone_github_url_with_token() -> None:
+    """
+    Test that a GitHub token is inserted into the clone URL and redacted from errors.
+
+    Given a GitHub URL and a configured token containing URL-unsafe characters:
+    When `clone_repo` is called and the clone fails,
+    Then git should receive the URL-encoded token in the netloc and the raised error should not contain it.
+    """
+    clone_config = CloneConfig(url="https://github.com/user/repo", local_path="/tmp/repo")
+    token, encoded_token = "tok/en+1234567", "tok%2Fen%2B1234567"
+    token_re = re.compile(f"{re.escape(encoded_token)}|{re.escape(token)}")
+
+    with patch.multiple("gitingest.cloning", GITHUB_PAT=token, _ENCODED_PAT=encoded_token, _PAT_RE=token_re):
+        with patch("gitingest.cloning.check_repo_exists", return_value=True):
+            with patch("gitingest.cloning.run_command", new_callable=AsyncMock) as mock_exec:
+                mock_exec.side_effect = RuntimeError(f"fatal: could not read https://{encoded_token}@github.com")
+
+                with pytest.raises(RuntimeError) as exc_info:
+                    await clone_repo(clone_config)
+
+    assert f"https://{encoded_token}@github.com/user/repo.git" in mock_exec.call_args.args
+    assert encoded_token not in str(exc_info.value)
+
+
+@pytest.mark.asyncio
+async def test_fetch_remote_branch_list_from_github_api() -> None:
+    """
+    Test that GitHub branches are listed through the REST API, following the pagination links.
+
+    Given a GitHub repository whose branches span two API pages and a configured token:
+    When `fetch_remote_branch_list` is called,
+    Then it should return the branches of both pages without running `git ls-remote`.
+    """
+    next_url = "https://api.github.com/repositories/1/branches?per_page=100&page=2"
+    first_page = MagicMock(status=200, links={"next": {"url": next_url}})
+    first_page.json = AsyncMock(return_value=[{"name": "main"}, {"name": "feature/a"}])
+    last_page = MagicMock(status=200, links={})
+    last_page.json = AsyncMock(return_value=[{"name": "release"}])
+
+    session = MagicMock()
+    session.get.return_value.__aenter__.side_effect = [first_page, last_page]
+
+    with patch("gitingest.utils.git_utils.GITHUB_PAT", "token"):
+        with patch("gitingest.utils.git_utils._get_http_session", return_value=session):
+            with patch("gitingest.utils.git_utils.run_command", new_callable=AsyncMock) as mock_exec:
+                branches = await fetch_remote_branch_list("https://github.com/user/repo")
+
+    assert branches == ["main", "feature/a", "release"]
+    assert session.get.call_args_list[1].args == (next_url,)
+    mock_exec.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_fetch_remote_branch_list_revalidates_with_etag() -> None:
+    """
+    Test that a cached GitHub branch list is reused while fresh and revalidated with its ETag once stale.
+
+    Given a GitHub PAT and a repository whose branch listing answers with an ETag, then with 304 Not Modified:
+    When the branch list is fetched twice while fresh and once more after it expired,
+    Then only two API requests should be sent, the second carrying `If-None-Match`, and the list should be unchanged.
+    """
+    listing = MagicMock(status=200, links={}, headers={"ETag": '"abc"'})
+    listing.json = AsyncMock(return_value=[{"name": "main"}])
+    not_modified = MagicMock(status=304, links={}, headers={})
+
+    session = MagicMock()
+    session.get.return_value.__aenter__.side_effect = [listing, not_modified]
+
+    with patch("gitingest.utils.git_utils.GITHUB_PAT", "token"):
+        with patch("gitingest.utils.git_utils._get_http_session", return_value=session):
+            assert await fetch_remote_branch_list("https://github.com/user/repo") == ["main"]
+            assert await fetch_remote_branch_list("https://github.com/user/repo") == ["main"]
+            assert session.get.call_count == 1
+
+            with patch("gitingest.utils.git_utils.time.monotonic", return_value=float("inf")):
+                assert await fetch_remote_branch_list("https://github.com/user/repo") == ["main"]
+
+    assert session.get.call_count == 2
+    assert session.get.call_args.kwargs["headers"]["If-None-Match"] == '"abc"'
+
+
+@pytest.mark.asyncio
+async def test_prefetch_repo_meta_reuses_branch_list(
+    mock_http_session: MockHttpSessionFunc,
+    async_lines: AsyncLinesFunc,
+) -> None:
+    """
+    Test that the branch list fetched by `prefetch_repo_meta` is reused by `fetch_remote_branch_list`.
+
+    Given a repository that exists:
+    When `prefetch_repo_meta` is awaited and the branch list is requested again in the same context,
+    Then the existence check and branch list should be returned and `git ls-remote` should run only once.
+    """
+    url = "https://github.com/user/repo"
+
+    with patch("gitingest.utils.git_utils.GITHUB_PAT", None):
+        with patch("gitingest.utils.git_utils._get_http_session", return_value=mock_http_session(200)):
+            with patch("gitingest.utils.git_utils.run_command_lines") as mock_exec:
+                mock_exec.side_effect = lambda *args, **kwargs: async_lines(b"abc123\trefs/heads/main\n")
+
+                exists, branches = await prefetch_repo_meta(url)
+                ls_remote_calls = mock_exec.call_count
+
+                assert exists is True
+                assert branches == ["main"]
+                assert await fetch_remote_branch_list(url) == ["main"]
+                assert mock_exec.call_count == ls_remote_calls
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    [
+        ("user/repo", ("user", "repo", "")),
+        ("/user/repo/tree/main/src/", ("user", "repo", "tree/main/src")),
+        ("https://github.com/user/repo.git", ("user", "repo", "")),
+        ("github.com/user/my.repo/blob/main/README.md", ("user", "my.repo", "blob/main/README.md")),
+        ("favicon.ico", None),
+        ("user name/repo", None),
+    ],
+)
+def test_parse_github_slug(source: str, expected: Optional[tuple]) -> None:
+    """
+    Test that `parse_github_slug` extracts the owner, repository and subpath of GitHub URLs and paths.
+
+    Given a GitHub URL, a repository path or a path that does not name a repository:
+    When `parse_github_slug` is called,
+    Then it should return the owner, repository and subpath, or None.
+    """
+    assert parse_github_slug(source) == expected
+
+
+@pytest.mark.asyncio
+async def test_check_repo_exists_shares_cache_between_repo_ref_and_url(mock_http_session: MockHttpSessionFunc) -> None:
+    """
+    Test that a repository checked as a parsed `RepoRef` is cached under the same key as its URL.
+
+    Given a path parsed with `parse_repo`:
+    When `check_repo_exists` is called with the `RepoRef`, then with the repository URL,
+    Then the URL should be derived from the parsed parts and only one HEAD request should be sent.
+    """
+    repo = parse_repo("/user/Repo/tree/main/src")
+    assert repo == RepoRef("github.com", "user", "Repo", "tree/main/src")
+    assert repo.url == "https://github.com/user/Repo"
+
+    session = mock_http_session(200)
+    with patch("gitingest.utils.git_utils.GITHUB_PAT", None):
+        with patch("gitingest.utils.git_utils._get_http_session", return_value=session):
+            assert await check_repo_exists(repo) is True
+            assert await check_repo_exists("https://github.com/user/repo") is True
+
+    session.head.assert_called_once()
+    assert session.head.call_args.args == ("https://github.com/user/Repo",)
+
+
+@pytest.mark.asyncio
+async def test_run_command_lines_streams_stdout() -> None:
+    """
+    Test that `run_command_lines` yields the standard output line by line and reports failures afterwards.
+
+    Given a command that prints two lines and then exits with a non-zero status:
+    When its output is iterated with `run_command_lines`,
+    Then both lines should be yielded before a RuntimeError carrying the standard error is raised.
+    """
+    script = "import sys; print('first'); print('second'); sys.stderr.write('boom'); sys.exit(1)"
+    lines = []
+
+    with pytest.raises(RuntimeError, match="boom"):
+        async for line in run_command_lines(sys.executable, "-c", script):
+            lines.append(line.strip())
+
+    assert lines == [b"first", b"second"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_github_head_sha_is_cached_and_revalidated() -> None:
+    """
+    Test that `fetch_github_head_sha` resolves HEAD through the GitHub API, caches it and revalidates it with its ETag.
+
+    Given a repository whose HEAD commit is returned with an ETag, then answered with 304 Not Modified:
+    When the HEAD commit is resolved twice while fresh and once more after it expired,
+    Then only two API requests should be sent, the second carrying `If-None-Match`, and git should never run.
+    """
+    sha = "a" * 40
+    found = MagicMock(status=200, headers={"ETag": '"abc"'})
+    found.text = AsyncMock(return_value=sha)
+    not_modified = MagicMock(status=304, headers={})
+
+    session = MagicMock()
+    session.get.return_value.__aenter__.side_effect = [found, not_modified]
+    repo = RepoRef("github.com", "user", "repo", "")
+
+    with patch("gitingest.utils.git_utils._get_http_session", return_value=session):
+        with patch("gitingest.utils.git_utils.run_command_lines") as mock_exec:
+            assert await fetch_github_head_sha(repo) == sha
+            assert await fetch_github_head_sha(repo) == sha
+            assert session.get.call_count == 1
+
+            with patch("gitingest.utils.git_utils.time.monotonic", return_value=float("inf")):
+                assert await fetch_github_head_sha(repo) == sha
+
+    assert session.get.call_count == 2
+    assert session.get.call_args.args == ("https://api.github.com/repos/user/repo/commits/HEAD",)
+    assert session.get.call_args.kwargs["headers"]["If-None-Match"] == '"abc"'
+    mock_exec.assert_not_called()
+
+
+def test_git_semaphore_is_bound_to_the_running_loop() -> None:
+    """
+    Test that `get_git_semaphore` creates a new semaphore for each event loop.
+
+    Given a concurrency limit of one and two consecutive `asyncio.run` calls that both contend for the semaphore:
+    When each call acquires the semaphore while another task waits for it,
+    Then neither call should fail with a semaphore bound to a different event loop.
+    """
+
+    async def contend() -> asyncio.Semaphore:
+        semaphore = get_git_semaphore()
+        async with semaphore:
+            waiter = asyncio.ensure_future(semaphore.acquire())
+            await asyncio.sleep(0)
+        await waiter
+        semaphore.release()
+        return semaphore
+
+    with patch("gitingest.utils.git_utils.GIT_CONCURRENCY", 1):
+        first = asyncio.run(contend())
+        second = asyncio.run(contend())
+
+    assert first is not second
+
+
+@pytest.mark.asyncio
+async def test_http_session_scope_closes_session_after_last_block() -> None:
+    """
+    Test that the shared HTTP session is kept while any scope is running and closed when the last one exits.
+
+    Given two overlapping `http_session_scope` blocks that both use the shared HTTP session:
+    When the inner block exits, and then the outer one,
+    Then the session should stay open until the outer block exits, and be closed afterwards.
+    """
+    async with http_session_scope():
+        async with http_session_scope():
+            session = git_utils._get_http_session()  # pylint: disable=protected-access
+        assert not session.closed
+        assert git_utils._get_http_session() is session  # pylint: disable=protected-access
+
+    assert session.closed
+
+
+def test_get_http_session_reports_session_left_open_by_ended_loop(caplog: pytest.LogCaptureFixture) -> None:
+    """
+    Test that a session left open by an event loop that has ended is reported rather than silently replaced.
+
+    Given an HTTP session that is still open and bound to a loop that is no longer running:
+    When the shared session is requested from another event loop,
+    Then a new session should be returned and a warning should be logged about the old one.
+    """
+    stale = MagicMock(closed=False)
+
+    async def get_session() -> aiohttp.ClientSession:
+        try:
+            return git_utils._get_http_session()  # pylint: disable=protected-access
+        finally:
+            await git_utils.close_http_session()
+
+    with patch("gitingest.utils.git_utils._http_session", stale):
+        with patch("gitingest.utils.git_utils._http_session_loop", MagicMock(is_running=lambda: False)):
+            session = asyncio.run(get_session())
+
+    assert session is not stale
+    assert "left open by an event loop that has ended" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_clone_timeout_excludes_waiting_for_a_slot() -> None:
+    """
+    Test that the time a clone waits for a git slot does not count against its timeout.
+
+    Given a concurrency limit of one, a slot held by another clone and a clone timeout of 50 ms:
+    When `clone_repo` waits longer than the timeout for the slot to be released,
+    Then the clone should still run once the slot is free.
+    """
+    clone_config = CloneConfig(url="https://github.com/user/repo", local_path="/tmp/repo")
+    timed_body = async_timeout(0.05)(cloning._clone_repo.__wrapped__)  # pylint: disable=protected-access
+
+    with patch("gitingest.utils.git_utils.GIT_CONCURRENCY", 1):
+        with patch("gitingest.cloning._clone_repo", timed_body):
+            with patch("gitingest.cloning.check_repo_exists", return_value=True):
+                with patch("gitingest.cloning.ensure_git_installed", new_callable=AsyncMock):
+                    with patch("gitingest.cloning.run_command", new_callable=AsyncMock) as mock_exec:
+                        semaphore = get_git_semaphore()
+                        async with semaphore:
+                            clone = asyncio.ensure_future(clone_repo(clone_config))
+                            await asyncio.sleep(0.1)
+                            mock_exec.assert_not_called()
+                        await clone
+
+    mock_exec.assert_called_once()